@@ -6,6 +6,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.graph_objects as go
 from strategies.base import BaseStrategy
+from utils.bootstrap import METRICS, bootstrap_metrics, confidence_intervals
 
 class PerformanceAnalyzer(BaseStrategy):
     def __init__(self, data_handler, portfolio_df: pd.DataFrame, orders: dict, strategy):
@@ -26,7 +27,10 @@ class PerformanceAnalyzer(BaseStrategy):
         self.df["drawdown"] = self.df["value"] / self.df["cum_max"] - 1
 
 
-    def compute_statistics(self, fees=0):
+    def raw_statistics(self, fees=0):
+        """
+        Mêmes métriques que compute_statistics, non arrondies.
+        """
         total_return = self.df["cumulative_return"].iloc[-1] - 1
         annualized_return = (1 + total_return) ** (252 / len(self.df)) - 1
         annualized_volatility = self.df["returns"].std() * np.sqrt(252)
@@ -34,17 +38,35 @@ class PerformanceAnalyzer(BaseStrategy):
         max_drawdown = self.df["drawdown"].min()
         diversification = self.diversification_effective()
         total_fees = self.compute_fees(fees)
-        self.stats = {
-            "Annualized Return (%)": round(annualized_return * 100, 2),
-            "Annualized Volatility (%)": round(annualized_volatility * 100, 2),
-            "Sharpe Ratio": round(sharpe, 2),
-            "Max Drawdown (%)": round(max_drawdown * 100, 2),
-            "Total Return (%)": round(total_return * 100, 2),
-            "Frais (%)": round(total_fees, 2),
-            "Diversification": round(diversification, 2),
+        return {
+            "Annualized Return (%)": annualized_return * 100,
+            "Annualized Volatility (%)": annualized_volatility * 100,
+            "Sharpe Ratio": sharpe,
+            "Max Drawdown (%)": max_drawdown * 100,
+            "Total Return (%)": total_return * 100,
+            "Frais (%)": total_fees,
+            "Diversification": diversification,
         }
+
+    def compute_statistics(self, fees=0):
+        self.stats = {key: round(value, 2) for key, value in self.raw_statistics(fees).items()}
         return self.stats
 
+    def confidence_intervals(self, level=0.95, n_paths=10000, block_size=20, method="stationary", seed=None,
+                             chunk_size=2000, max_workers=1):
+        """
+        Intervalles de confiance bootstrap (utils.bootstrap) des métriques de rendement,
+        à côté des estimations ponctuelles non arrondies de raw_statistics.
+        """
+        samples = bootstrap_metrics(
+            self.df["returns"], n_paths=n_paths, block_size=block_size, method=method, seed=seed,
+            chunk_size=chunk_size, n_obs=len(self.df), risk_free_rate=self.risk_free_rate, max_workers=max_workers
+        )
+        intervals = confidence_intervals(samples, level)
+        stats = self.raw_statistics()
+        intervals.insert(0, "Portefeuille", [stats[metric] for metric in METRICS])
+        return intervals
+
     def diversification_effective(self):
         df = self.df.copy()
         asset_symbols = [
@@ -0,0 +1,192 @@
+import copy
+import weakref
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+
+
+class CostModel(ABC):
+    """
+    Modèle de coûts évalué sur des tableaux d'ordres entiers.
+    rows : positions dans le calendrier, symbols : indices dans la liste passée à
+    prepare, size : quantités signées, price : prix avant coûts.
+    slippage renvoie un écart de prix relatif (>= 0) appliqué contre l'ordre,
+    fee des frais en devise (>= 0).
+    """
+    def prepare(self, data_handler, symbols):
+        """
+        Modèle prêt pour (data_handler, symbols) : précalculs par exécution (ADV,
+        volatilité...). Le modèle configuré n'est pas modifié et peut servir à
+        d'autres exécutions.
+        """
+        return self
+
+    def slippage(self, rows, symbols, size, price):
+        return np.zeros(len(size))
+
+    def fee(self, rows, symbols, size, executed_price):
+        return np.zeros(len(size))
+
+    def __add__(self, other):
+        return CompositeCost([self, other])
+
+
+class CompositeCost(CostModel):
+    def __init__(self, models):
+        self.models = []
+        for model in models:
+            self.models.extend(model.models if isinstance(model, CompositeCost) else [model])
+
+    def prepare(self, data_handler, symbols):
+        return CompositeCost([model.prepare(data_handler, symbols) for model in self.models])
+
+    def slippage(self, rows, symbols, size, price):
+        return sum(model.slippage(rows, symbols, size, price) for model in self.models)
+
+    def fee(self, rows, symbols, size, executed_price):
+        return sum(model.fee(rows, symbols, size, executed_price) for model in self.models)
+
+
+class FlatCost(CostModel):
+    """
+    Slippage et frais proportionnels (comportement historique de general.yaml).
+    """
+    def __init__(self, slippage=0.0, fee_rate=0.0):
+        self.slippage_pct = slippage
+        self.fee_pct = fee_rate
+
+    def slippage(self, rows, symbols, size, price):
+        return np.full(len(size), self.slippage_pct)
+
+    def fee(self, rows, symbols, size, executed_price):
+        return np.abs(executed_price * size) * self.fee_pct
+
+
+class RollingCostModel(CostModel):
+    """
+    Base des modèles qui s'appuient sur des séries glissantes alignées sur le
+    calendrier, calculées une fois par symbole et par DataHandler puis réutilisées
+    d'un ordre (ou d'un backtest) à l'autre.
+    Chaque série est décalée d'un jour : seule l'information de la veille est utilisée.
+    prepare renvoie une copie liée au DataHandler et aux symboles de l'exécution.
+    """
+    def __init__(self, window=20):
+        self.window = window
+        self.symbols = []
+        self._handler = None
+        self._series = {}
+        # DataHandler -> {symbole: séries}, partagé par toutes les copies préparées
+        self._cache = weakref.WeakKeyDictionary()
+
+    def prepare(self, data_handler, symbols):
+        prepared = copy.copy(self)
+        prepared._handler = data_handler
+        prepared._series = self._cache.setdefault(data_handler, {})
+        prepared.symbols = list(symbols)
+        for symbol in prepared.symbols:
+            if symbol not in prepared._series:
+                prepared._series[symbol] = prepared._compute(symbol)
+        return prepared
+
+    def _field(self, symbol, field):
+        if field not in self._handler.fields(symbol):
+            raise ValueError(f"Colonne {field} absente pour {symbol}")
+        return pd.Series(np.asarray(self._handler.column(symbol, field), dtype=np.float64))
+
+    def _rolling(self, series, how):
+        return getattr(series.rolling(self.window, min_periods=1), how)().shift(1).to_numpy()
+
+    def _lookup(self, name, rows, symbols):
+        out = np.empty(len(rows))
+        for i in np.unique(symbols):
+            sel = symbols == i
+            out[sel] = self._series[self.symbols[i]][name][rows[sel]]
+        return out
+
+    @abstractmethod
+    def _compute(self, symbol) -> dict:
+        """Séries glissantes {nom: tableau aligné sur le calendrier} d'un symbole."""
+
+
+class SquareRootImpact(RollingCostModel):
+    """
+    Impact de marché en racine carrée du taux de participation :
+    impact = coef * sigma_jour * sqrt(|taille| / ADV).
+    """
+    def __init__(self, coef=0.1, window=20, max_impact=0.1):
+        super().__init__(window)
+        self.coef = coef
+        self.max_impact = max_impact
+
+    def _compute(self, symbol):
+        returns = self._field(symbol, 'Close').pct_change(fill_method=None)
+        return {
+            "adv": self._rolling(self._field(symbol, 'Volume'), "mean"),
+            "volatility": self._rolling(returns, "std"),
+        }
+
+    def slippage(self, rows, symbols, size, price):
+        adv = self._lookup("adv", rows, symbols)
+        sigma = np.nan_to_num(self._lookup("volatility", rows, symbols))
+        participation = np.divide(np.abs(size), adv, out=np.zeros(len(size)), where=adv > 0)
+        return np.minimum(self.coef * sigma * np.sqrt(participation), self.max_impact)
+
+
+class HighLowSpread(RollingCostModel):
+    """
+    Demi-spread estimé à partir de l'amplitude High/Low moyenne :
+    slippage = factor * moyenne((High - Low) / Close) / 2.
+    """
+    def __init__(self, factor=0.5, window=20):
+        super().__init__(window)
+        self.factor = factor
+
+    def _compute(self, symbol):
+        amplitude = (self._field(symbol, 'High') - self._field(symbol, 'Low')) / self._field(symbol, 'Close')
+        return {"spread": self._rolling(amplitude, "mean")}
+
+    def slippage(self, rows, symbols, size, price):
+        return np.nan_to_num(self.factor * self._lookup("spread", rows, symbols) / 2)
+
+
+class PerShareFee(CostModel):
+    """
+    Frais par action avec minimum par ordre et plafond en % du notionnel.
+    """
+    def __init__(self, per_share=0.005, minimum=1.0, max_pct=0.01):
+        self.per_share = per_share
+        self.minimum = minimum
+        self.max_pct = max_pct
+
+    def fee(self, rows, symbols, size, executed_price):
+        fee = np.maximum(self.per_share * np.abs(size), self.minimum)
+        if self.max_pct is not None:
+            fee = np.minimum(fee, self.max_pct * np.abs(executed_price * size))
+        return np.where(size != 0, fee, 0.0)
+
+
+COST_MODELS = {
+    "flat": FlatCost,
+    "sqrt_impact": SquareRootImpact,
+    "high_low_spread": HighLowSpread,
+    "per_share_fee": PerShareFee,
+}
+
+
+def cost_model_from_config(general_config) -> CostModel:
+    """
+    Section optionnelle cost_models de general.yaml, par ex. :
+        cost_models:
+          sqrt_impact: {coef: 0.1, window: 20}
+          per_share_fee: {per_share: 0.005, minimum: 1.0}
+    Sans cette section : FlatCost(slippage, fee_rate).
+    """
+    specs = general_config.get("cost_models")
+    if not specs:
+        return FlatCost(general_config["slippage"], general_config["fee_rate"])
+    models = []
+    for name, params in specs.items():
+        if name not in COST_MODELS:
+            raise ValueError(f"Modèle de coûts inconnu : {name}")
+        models.append(COST_MODELS[name](**(params or {})))
+    return models[0] if len(models) == 1 else CompositeCost(models)
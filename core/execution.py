@@ -1,35 +1,114 @@
+import numpy as np
 from strategies.base import BaseStrategy
+from core.costs import cost_model_from_config
+
+# Codes d'action du carnet d'ordres (champ 'side')
+ACTIONS = ('buy', 'sell', 'exit', 'deposit')
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+ORDER_DTYPE = np.dtype([
+    ('row', np.int64),      # position de la date dans le calendrier
+    ('symbol', np.int32),   # indice du symbole
+    ('side', np.int8),      # code d'action, voir ACTIONS
+    ('size', np.float64),
+])
+
+EXECUTED_DTYPE = np.dtype(ORDER_DTYPE.descr + [
+    ('price', np.float64),
+    ('fee', np.float64),
+    ('cost', np.float64),
+    ('filled', np.bool_),
+])
+
+
+def orders_to_book(orders: dict, symbols: list, date_rows: dict) -> np.ndarray:
+    """
+    Convertit {date: [{'symbol', 'action', 'size'}]} en carnet d'ordres structuré,
+    trié par date puis dans l'ordre d'origine.
+    """
+    symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+    records = [
+        (date_rows[date], symbol_ids[order['symbol']], ACTION_CODES[order['action']], order['size'])
+        for date in sorted(orders) if date in date_rows
+        for order in orders[date]
+    ]
+    return np.array(records, dtype=ORDER_DTYPE)
+
+
+def book_to_orders(book: np.ndarray, symbols: list, dates) -> dict:
+    """
+    Carnet exécuté -> {date: [ordres]} au format de OrderExecutor.execute
+    (ordres non exécutés exclus, aucune date vide).
+    """
+    executed = {}
+    for order in book[book['filled']]:
+        executed.setdefault(dates[order['row']], []).append({
+            'symbol': symbols[order['symbol']],
+            'action': ACTIONS[order['side']],
+            'size': order['size'].item(),
+            'price': order['price'].item(),
+            'cost': order['cost'].item(),
+            'fee': order['fee'].item(),
+        })
+    return executed
+
 
 class OrderExecutor(BaseStrategy):
-    def __init__(self, data_handler):
+    def __init__(self, data_handler, cost_model=None):
         super().__init__()
-        self.slippage_pct = self.general_config["slippage"]
-        self.fee_pct = self.general_config["fee_rate"]
         self.data_handler = data_handler
+        # Par défaut : slippage / fee_rate proportionnels de general.yaml
+        self.cost_model = cost_model or cost_model_from_config(self.general_config)
 
     def execute(self, orders, date, order_time='Open'):
         executed = {date: []}
-        for order in orders:
-            symbol = order['symbol']
-            action = order['action']
-            size = order['size']
-
-            try:
-                price = self.data_handler.get(symbol, price=order_time).loc[date]
-            except KeyError:
+        if not orders:
+            return executed
+        symbols = list(dict.fromkeys(order['symbol'] for order in orders))
+        book = self.execute_batch(
+            orders_to_book({date: orders}, symbols, self.data_handler.date_rows()), symbols, order_time
+        )
+        for order, fill in zip(orders, book):
+            # Pas de cotation ce jour-là (masque de données du calendrier maître)
+            if not fill['filled']:
                 continue
-
-            slippage = price * self.slippage_pct
-            executed_price = price + slippage if action == 'buy' else price - slippage
-            fee = executed_price * abs(size) * self.fee_pct
-            cost = executed_price * size + (fee if action == 'buy' else -fee)
-
+            # Valeurs exactes : l'arrondi est réservé à l'affichage
             executed[date].append({
-                'symbol': symbol,
-                'action': action,
-                'size': size,
-                'price': round(executed_price, 2),
-                'cost': round(cost, 2),
-                'fee': round(fee, 3)
+                'symbol': order['symbol'],
+                'action': order['action'],
+                'size': order['size'],
+                'price': fill['price'].item(),
+                'cost': fill['cost'].item(),
+                'fee': fill['fee'].item()
             })
         return executed
+
+    def execute_batch(self, book: np.ndarray, symbols: list, order_time='Open') -> np.ndarray:
+        """
+        Exécute tout le carnet (ORDER_DTYPE) en une passe vectorisée :
+        un accès par symbole à la colonne de prix, puis prix exécuté, frais et coût
+        calculés sur tableaux entiers par le modèle de coûts.
+        Retourne un tableau EXECUTED_DTYPE.
+        """
+        executed = np.zeros(len(book), dtype=EXECUTED_DTYPE)
+        for name in ORDER_DTYPE.names:
+            executed[name] = book[name]
+        price = np.full(len(book), np.nan)
+        filled = np.zeros(len(book), dtype=bool)
+        for i in np.unique(book['symbol']):
+            sel = book['symbol'] == i
+            rows = book['row'][sel]
+            filled[sel] = self.data_handler.mask(symbols[i])[rows]
+            price[sel] = self.data_handler.column(symbols[i], order_time)[rows]
+
+        buy = book['side'] == ACTION_CODES['buy']
+        sign = np.where(buy, 1.0, -1.0)
+        size = sign * np.abs(book['size'])
+        model = self.cost_model.prepare(self.data_handler, symbols)
+        executed_price = price * (1 + sign * model.slippage(book['row'], book['symbol'], size, price))
+        fee = model.fee(book['row'], book['symbol'], size, executed_price)
+        executed['price'] = executed_price
+        executed['fee'] = fee
+        executed['cost'] = executed_price * book['size'] + np.where(buy, fee, -fee)
+        executed['filled'] = filled
+        return executed
@@ -1,4 +1,5 @@
 import pandas as pd
+import numpy as np
 from strategies.base import BaseStrategy
 
 class Portfolio(BaseStrategy):
@@ -11,6 +12,11 @@ class Portfolio(BaseStrategy):
         self.data_handler = data_handler
         self.strategy = strategy
         self.history = []
+        # Série de valorisation par symbole (Adj Close si disponible), adressée par position
+        self.value_columns = [
+            data_handler.column(symbol, 'Adj Close' if 'Adj Close' in data_handler.fields(symbol) else 'Close')
+            for symbol in symbols
+        ]
 
     def update(self, date, executed_orders):
         for order in executed_orders[date]:
@@ -34,13 +40,10 @@ class Portfolio(BaseStrategy):
                 self.position_qty[f"{symbol}_qty"] += size
         value = self.cash
         position_values = {}
+        row = self.data_handler.date_rows()[date]
 
-        for symbol in self.symbols:
-            price = self.data_handler.get(symbol).loc[[date]]
-            if 'Adj Close' in price.columns:
-                pos_value = self.position_qty[f"{symbol}_qty"] * price['Adj Close'].iloc[-1]
-            else:
-                pos_value = self.position_qty[f"{symbol}_qty"] * price['Close'].iloc[-1]
+        for symbol, prices in zip(self.symbols, self.value_columns):
+            pos_value = self.position_qty[f"{symbol}_qty"] * np.float64(prices[row])
             value += pos_value
             position_values[symbol] = round(pos_value, 2)
             self.value = value
@@ -57,4 +60,86 @@ class Portfolio(BaseStrategy):
     def get_history(self):
         portfolio = pd.DataFrame(self.history).set_index('date')
         portfolio.to_csv(f'output/{self.strategy.name}/portfolio.csv')
-        return portfolio
\ No newline at end of file
+        return portfolio
+
+
+class ArrayPortfolio:
+    """
+    Portefeuille à base de tableaux : identifiants entiers par symbole, vecteur de
+    positions et historique écrit dans des buffers NumPy préalloués (taille du
+    calendrier), converti en DataFrame uniquement dans get_history.
+    Même interface et même comptabilité que Portfolio.
+    """
+    __slots__ = (
+        "symbols", "symbol_ids", "data_handler", "strategy", "cash", "value",
+        "positions", "prices", "_rows", "_cash", "_value", "_qty", "_n",
+    )
+
+    def __init__(self, symbols, data_handler, strategy, dates=None):
+        self.symbols = list(symbols)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.data_handler = data_handler
+        self.strategy = strategy
+        self.cash = float(strategy.capital)
+        self.value = self.cash
+        self.positions = np.zeros(len(self.symbols))
+        # Matrice de valorisation (calendrier x symboles), Adj Close si disponible
+        n_rows = len(data_handler.calendar())
+        self.prices = np.empty((n_rows, len(self.symbols)))
+        for j, symbol in enumerate(self.symbols):
+            field = 'Adj Close' if 'Adj Close' in data_handler.fields(symbol) else 'Close'
+            self.prices[:, j] = data_handler.column(symbol, field)
+        capacity = len(dates) if dates is not None else n_rows
+        self._rows = np.empty(capacity, dtype=np.int64)
+        self._cash = np.empty(capacity)
+        self._value = np.empty(capacity)
+        self._qty = np.empty((capacity, len(self.symbols)))
+        self._n = 0
+
+    def _grow(self):
+        capacity = max(2 * len(self._rows), 1)
+        self._rows = np.resize(self._rows, capacity)
+        self._cash = np.resize(self._cash, capacity)
+        self._value = np.resize(self._value, capacity)
+        self._qty = np.resize(self._qty, (capacity, len(self.symbols)))
+
+    def update(self, date, executed_orders):
+        positions = self.positions
+        for order in executed_orders[date]:
+            i = self.symbol_ids[order['symbol']]
+            action = order['action']
+            if action == 'buy':
+                self.cash -= order['cost']
+                positions[i] += order['size']
+            elif action == 'sell':
+                self.cash += abs(order['cost'])
+                positions[i] -= abs(order['size'])
+            elif action == 'exit':
+                self.cash += positions[i] * order['price']
+                positions[i] = 0
+            elif action == 'deposit':
+                positions[i] += order['size']
+        row = self.data_handler.date_rows()[date]
+        self.value = self.cash + (positions * self.prices[row]).sum()
+
+        if self._n == len(self._rows):
+            self._grow()
+        n = self._n
+        self._rows[n] = row
+        self._cash[n] = self.cash
+        self._value[n] = self.value
+        self._qty[n] = positions
+        self._n = n + 1
+
+    def get_history(self, to_csv=True):
+        n = self._n
+        rows = self._rows[:n]
+        qty = self._qty[:n]
+        columns = {'cash': np.round(self._cash[:n], 2), 'value': np.round(self._value[:n], 2)}
+        columns.update({f"{symbol}_qty": qty[:, j] for j, symbol in enumerate(self.symbols)})
+        position_values = np.round(qty * self.prices[rows], 2)
+        columns.update({symbol: position_values[:, j] for j, symbol in enumerate(self.symbols)})
+        portfolio = pd.DataFrame(columns, index=pd.DatetimeIndex(self.data_handler.calendar()[rows], name='date'))
+        if to_csv:
+            portfolio.to_csv(f'output/{self.strategy.name}/portfolio.csv')
+        return portfolio
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from strategies.base import BaseStrategy
+from core.costs import cost_model_from_config
+
+
+def ffill_rows(a: np.ndarray) -> np.ndarray:
+    """
+    Propage vers le bas la dernière valeur non-NaN de chaque colonne.
+    """
+    rows = np.where(np.isnan(a), 0, np.arange(a.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return a[rows, np.arange(a.shape[1])]
+
+
+def orders_to_targets(orders: dict, symbols: list, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """
+    Convertit un dictionnaire d'ordres {date: [{'symbol', 'action', 'size'}]}
+    en matrice de quantités cibles (dates x symboles), NaN = position inchangée.
+    """
+    targets = pd.DataFrame(np.nan, index=dates, columns=list(symbols))
+    held = dict.fromkeys(symbols, 0.0)
+    for date in sorted(orders):
+        if date not in targets.index:
+            continue
+        for order in orders[date]:
+            symbol = order['symbol']
+            action = order['action']
+            if action == 'buy':
+                held[symbol] += order['size']
+            elif action == 'sell':
+                held[symbol] -= abs(order['size'])
+            elif action == 'exit':
+                held[symbol] = 0.0
+            else:
+                raise ValueError(f"Action non supportée par le moteur vectorisé : {action}")
+            targets.loc[date, symbol] = held[symbol]
+    return targets
+
+
+class VectorizedBacktester(BaseStrategy):
+    """
+    Moteur de backtest vectorisé : à partir d'une matrice de quantités (ou de poids)
+    cibles dates x symboles, calcule exécutions, frais, slippage, cash, valeur des
+    positions et courbe de valeur en opérations NumPy sur tableaux entiers.
+    Produit le même portfolio_df que Portfolio.get_history.
+    """
+    def __init__(self, data_handler, symbols, start=None, end=None, order_time='Open', cost_model=None):
+        super().__init__()
+        self.data_handler = data_handler
+        self.symbols = list(symbols)
+        self.cost_model = (cost_model or cost_model_from_config(self.general_config)).prepare(data_handler, self.symbols)
+        self.order_time = order_time
+        start = self.start if start is None else start
+        end = self.end if end is None else end
+        valuation = ['Adj Close' if 'Adj Close' in data_handler.fields(s) else 'Close' for s in self.symbols]
+        panel = data_handler.get_panel(self.symbols, sorted({order_time, *valuation}), start=start, end=end)
+        self.dates = panel.dates
+        self.rows = data_handler.calendar().get_indexer(self.dates)
+        self.valid = panel.mask & ~np.isnan(panel[order_time])
+        self.exec_prices = panel[order_time]
+        self.value_prices = ffill_rows(np.column_stack([
+            np.where(panel.mask[:, j], panel[field][:, j], np.nan) for j, field in enumerate(valuation)
+        ])) if self.symbols else np.empty((len(self.dates), 0))
+
+    def _align(self, targets):
+        if isinstance(targets, pd.DataFrame):
+            targets = targets.reindex(index=self.dates, columns=self.symbols).to_numpy(dtype=np.float64)
+        targets = np.asarray(targets, dtype=np.float64)
+        if targets.shape != (len(self.dates), len(self.symbols)):
+            raise ValueError(f"Matrice cible de forme {targets.shape}, attendu {(len(self.dates), len(self.symbols))}")
+        return targets
+
+    def run(self, targets, kind="quantity") -> pd.DataFrame:
+        """
+        targets : quantités (kind="quantity") ou poids du portefeuille (kind="weight").
+        NaN = conserver la position. Une cible en quantité tombant un jour sans
+        cotation est exécutée au premier jour coté suivant (sauf si une nouvelle
+        cible la remplace d'ici là) ; en poids, le symbole non coté garde sa quantité.
+        """
+        targets = self._align(targets)
+        if kind == "weight":
+            targets = self._weights_to_quantities(targets)
+        elif kind != "quantity":
+            raise ValueError(f"Type de cible inconnu : {kind}")
+
+        # Dernière cible connue à chaque ligne, appliquée seulement aux lignes cotées
+        held = ffill_rows(np.where(self.valid, ffill_rows(targets), np.nan))
+        held = np.nan_to_num(held, nan=0.0)
+        trades = np.diff(held, axis=0, prepend=0.0)
+        executed_price = np.zeros_like(trades)
+        fees = np.zeros_like(trades)
+        i, j = np.nonzero(trades)
+        executed_price[i, j], fees[i, j] = self._fill(i, j, trades[i, j])
+        cash = self.capital - np.cumsum((executed_price * trades + fees).sum(axis=1))
+        position_values = np.where(held != 0, held * self.value_prices, 0.0)
+        value = cash + position_values.sum(axis=1)
+
+        self.held = held
+        self.trades = trades
+        self.executed_price = executed_price
+        self.fees = fees
+        self.total_fees = float(fees.sum())
+
+        columns = {'cash': np.round(cash, 2), 'value': np.round(value, 2)}
+        columns.update({f"{s}_qty": held[:, j] for j, s in enumerate(self.symbols)})
+        columns.update({s: np.round(position_values[:, j], 2) for j, s in enumerate(self.symbols)})
+        return pd.DataFrame(columns, index=pd.DatetimeIndex(self.dates, name='date'))
+
+    def _fill(self, i, j, size):
+        """
+        Prix exécutés et frais des transactions (i, j) de taille signée size.
+        """
+        price = self.exec_prices[i, j]
+        rows = self.rows[i]
+        executed_price = price * (1 + np.sign(size) * self.cost_model.slippage(rows, j, size, price))
+        return executed_price, self.cost_model.fee(rows, j, size, executed_price)
+
+    def run_orders(self, orders: dict) -> pd.DataFrame:
+        return self.run(orders_to_targets(orders, self.symbols, self.dates))
+
+    def _weights_to_quantities(self, weights):
+        # Seules les dates de rebalancement (ligne non entièrement NaN) sont séquentielles :
+        # la taille dépend de la valeur du portefeuille avant l'ordre.
+        quantities = np.full_like(weights, np.nan)
+        held = np.zeros(len(self.symbols))
+        cash = self.capital
+        for row in np.flatnonzero(~np.isnan(weights).all(axis=1)):
+            valid = self.valid[row]
+            value = cash + np.nansum(np.where(held != 0, held * self.value_prices[row], 0.0))
+            target = np.where(
+                valid & ~np.isnan(weights[row]),
+                np.nan_to_num(weights[row]) * value / np.where(valid, self.exec_prices[row], 1.0),
+                held
+            )
+            j = np.flatnonzero(target != held)
+            trade = target[j] - held[j]
+            executed_price, fees = self._fill(np.full(len(j), row), j, trade)
+            cash -= (executed_price * trade + fees).sum()
+            held = target
+            quantities[row] = target
+        return quantities
+
+    def executed_orders(self) -> dict:
+        """
+        Ordres exécutés au format de OrderExecutor.execute, pour l'affichage.
+        """
+        executed = {}
+        for i, j in zip(*np.nonzero(self.trades)):
+            trade = self.trades[i, j]
+            executed.setdefault(self.dates[i], []).append({
+                'symbol': self.symbols[j],
+                'action': 'buy' if trade > 0 else 'sell',
+                'size': abs(trade),
+                'price': self.executed_price[i, j],
+                'cost': self.executed_price[i, j] * trade + self.fees[i, j],
+                'fee': self.fees[i, j],
+            })
+        return executed
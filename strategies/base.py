@@ -9,11 +9,14 @@ import json
 from utils.options_utils import load_yaml
 
 class BaseStrategy(ABC):
-    def __init__(self):
+    def __init__(self, start=None, end=None):
         self.general_config = load_yaml('config/general.yaml')
         self.capital = self.general_config["capital"]
-        self.start = pd.Timestamp(self.general_config["start_date"])
-        self.end = pd.Timestamp(self.general_config["end_date"])
+        # Période du YAML, surchargeable (fenêtres du walk-forward)
+        self.start = pd.Timestamp(self.general_config["start_date"] if start is None else start)
+        self.end = pd.Timestamp(self.general_config["end_date"] if end is None else end)
+        # Exécution sans terminal (utils.batch_runner) : pas de rendu Rich des ordres
+        self.headless = False
 
 
     def load_json_config(self, filename):
@@ -50,8 +53,8 @@ class BaseStrategy(ABC):
                     order['symbol'],
                     action_style,
                     str(order['size']),
-                    str(order['price']),
-                    str(order['fee']),
+                    str(round(order['price'], 2)),
+                    str(round(order['fee'], 3)),
                 )
                 first_row = False
 
@@ -59,7 +62,7 @@ class BaseStrategy(ABC):
 
         
     def show_orders(self, executed_orders):
-        if sys.__stdout__.isatty():
+        if not self.headless and sys.__stdout__.isatty():
             self.display_orders_colors(executed_orders)
             return
 
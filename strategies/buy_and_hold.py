@@ -1,26 +1,28 @@
 import config
 from strategies.base import BaseStrategy
-from utils.backtest_utils import DataHandler
+from utils.backtest_utils import get_data_handler
 import datetime
 import pandas as pd
 import numpy as np
-from core.execution import OrderExecutor
+from core.execution import OrderExecutor, orders_to_book, book_to_orders
 from core.compute_performance import PerformanceAnalyzer
-from core.portfolio import Portfolio
+from core.portfolio import ArrayPortfolio
 from tabulate import tabulate
 from utils.options_utils import load_yaml
+from utils.benchmark_cache import cached_benchmark
 
 class BuyAndHold(BaseStrategy):
-    def __init__(self, preset):
+    def __init__(self, preset, data_handler=None, save_outputs=True):
         super().__init__()
         self.name = "Buy and Hold Strategy"
         self.config = load_yaml('config/buy_and_hold.yaml')
         self.preset = preset
         self.reallocation_window = self.config["reallocation_window"]
         self.reallocation_amount = self.config["reallocation_amount"]
-        self.data_handler = DataHandler(data_path = "data/etf.pkl")
+        self.save_outputs = save_outputs
+        self.data_handler = data_handler or get_data_handler("data/etf.pkl")
         self.assets_dict = self.config["portfolio_presets"].get(self.preset,{self.preset: 1})
-        self.dates = self.data_handler.get(self.assets_dict.keys(), start=self.start, end=self.end).index
+        self.dates = self.data_handler.trading_dates(self.start, self.end)
     
     
     def generate_orders(self):
@@ -29,9 +31,10 @@ class BuyAndHold(BaseStrategy):
         first_date = self.dates[self.dates >= self.start][0]
         mask = [i % self.reallocation_window == 0 and i != 0 for i in range(len(self.dates))]
         allocation_dates = self.dates[mask]
+        rows = self.data_handler.date_rows()
         for asset, weight in self.assets_dict.items():
             if weight != 0:
-                price = self.data_handler.get(asset, price='Adj Close').loc[first_date]
+                price = np.float64(self.data_handler.column(asset, 'Adj Close')[rows[first_date]])
                 day_orders.append({'symbol': asset, 'action': 'buy', 'size': weight*self.capital/price})
         orders[first_date] = day_orders
         if self.reallocation_amount != 0:
@@ -39,7 +42,7 @@ class BuyAndHold(BaseStrategy):
                 day_orders = [] 
                 for asset, weight in self.assets_dict.items():
                     if weight != 0:
-                            price = self.data_handler.get(asset, price='Adj Close').loc[date]
+                            price = np.float64(self.data_handler.column(asset, 'Adj Close')[rows[date]])
                             day_orders.append({'symbol': asset, 'action': 'deposit', 'size': weight*self.reallocation_amount/price})
                 orders[date] = day_orders
         return orders
@@ -49,19 +52,18 @@ class BuyAndHold(BaseStrategy):
         executor = OrderExecutor(data_handler=self.data_handler)
         self.orders = self.generate_orders()
         active_symbols = list(self.assets_dict.keys())
-        portfolio = Portfolio(symbols=active_symbols, data_handler=self.data_handler, strategy=self)
-        date_range = pd.date_range(start=self.start, end=self.end)
-        total_fees = 0
+        portfolio = ArrayPortfolio(symbols=active_symbols, data_handler=self.data_handler, strategy=self, dates=self.dates)
+        book = executor.execute_batch(
+            orders_to_book(self.orders, active_symbols, self.data_handler.date_rows()), active_symbols, order_time='Adj Close'
+        )
+        total_fees = book['fee'][book['filled']].sum()
+        executed_by_date = book_to_orders(book, active_symbols, self.data_handler.calendar())
         self.executed_orders = {}
-        for date in date_range:
-            if date not in self.dates:
-                continue
-            orders_today = self.orders.get(date, [])  
-            executed = executor.execute(orders_today, date, order_time='Adj Close')
-            total_fees += sum(order.get("fee", 0.0) for order in executed[date])
+        for date in self.dates:
+            executed = {date: executed_by_date.get(date, [])}
             self.executed_orders[date] = executed[date]
             portfolio.update(date, executed)
-        portfolio_df = portfolio.get_history()
+        portfolio_df = portfolio.get_history(to_csv=self.save_outputs)
         self.analyzer = PerformanceAnalyzer(self.data_handler, portfolio_df, self.orders, strategy=self)
         if self.reallocation_amount == 0:
             stats = self.analyzer.compute_statistics(total_fees)
@@ -71,7 +73,7 @@ class BuyAndHold(BaseStrategy):
         return portfolio_df, stats_df
         
     def run_backtest(self, plot=False):
-        benchmark_portfolio_df, benchmark_stats_df = self.run_benchmark('SPY')
+        benchmark_portfolio_df, benchmark_stats_df = cached_benchmark('SPY', data_handler=self.data_handler)
         portfolio_df, stats_df = self.run_benchmark(preset=self.preset)
         all_stats = pd.concat([stats_df, benchmark_stats_df], axis=1)
         all_stats.index.name = "Statistique"
@@ -1,69 +1,224 @@
 from strategies.base import BaseStrategy
-from utils.backtest_utils import DataHandler
+from utils.backtest_utils import get_data_handler, data_fingerprint
 import pandas as pd
 import numpy as np
 import cvxpy as cp
 from sklearn.covariance import LedoitWolf
-from core.portfolio import Portfolio
+from core.portfolio import ArrayPortfolio
 from core.execution import OrderExecutor
 from core.compute_performance import PerformanceAnalyzer
 from tabulate import tabulate
-from strategies.buy_and_hold import BuyAndHold
+from utils.benchmark_cache import cached_benchmark
 from tqdm import tqdm
 import sys 
+import os
+import json
+import hashlib
 import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
 from utils.options_utils import load_yaml
+from utils.rolling_stats import RollingMoments
+
+WEIGHTS_DIR = "output/Markowitz Strategy/weights"
+
+
+def covariance_factor(cov_matrix):
+    """
+    F tel que F.T @ F = cov_matrix (Cholesky, ou racine spectrale si la matrice
+    n'est que semi-définie positive).
+    """
+    try:
+        return np.linalg.cholesky(cov_matrix).T
+    except np.linalg.LinAlgError:
+        eigval, eigvec = np.linalg.eigh(cov_matrix)
+        return (eigvec * np.sqrt(np.clip(eigval, 0, None))).T
+
+
+class MarkowitzQP:
+    """
+    min ||F w||² - gamma * ret  s.c.  ret = mu @ w, sum(w) = 1, w >= 0,
+    n * ||w||² <= 1 / diversification.
+    gamma, mu et le facteur de covariance F sont des cp.Parameter (forme DPP,
+    la variable auxiliaire ret évite le produit gamma * mu) : cvxpy canonicalise
+    le problème une seule fois, les résolutions suivantes repartent de la
+    solution précédente (warm start).
+    """
+    def __init__(self, n, diversification):
+        self.n = n
+        self.w = cp.Variable(n)
+        self.ret = cp.Variable()
+        self.gamma = cp.Parameter(nonneg=True)
+        self.mu = cp.Parameter(n)
+        self.factor = cp.Parameter((n, n))
+        objective = cp.Minimize(cp.sum_squares(self.factor @ self.w) - self.gamma * self.ret)
+        constraints = [
+            self.ret == self.mu @ self.w,
+            cp.sum(self.w) == 1,
+            self.w >= 0,
+            n * cp.sum_squares(self.w) <= 1/diversification
+        ]
+        self.problem = cp.Problem(objective, constraints)
+
+    def set_moments(self, mean_returns, cov_matrix, shrinkage_level=0.5):
+        global_mean = mean_returns.mean()
+        self.mu.value = (1 - shrinkage_level) * mean_returns + shrinkage_level * global_mean
+        self.factor.value = covariance_factor(cov_matrix)
+
+    def solve(self, gamma):
+        self.gamma.value = gamma
+        self.problem.solve(warm_start=True)
+        return self.w.value
+
+
+class MaxSharpeQP:
+    """
+    Portefeuille tangent exact (ratio de Sharpe maximal) par la reformulation
+    homogène : avec y = kappa * w,
+        min ||F y||²  s.c.  (mu - rf) @ y = 1, sum(y) = kappa, y >= 0,
+        ||y|| <= kappa / sqrt(n * diversification)   (n * ||w||² <= 1 / diversification)
+    puis w = y / kappa. Un seul problème convexe au lieu d'une grille de gammas.
+    Sans actif de rendement supérieur à rf, le problème est infaisable : solve retourne None.
+    """
+    def __init__(self, n, diversification):
+        self.n = n
+        self.y = cp.Variable(n)
+        self.kappa = cp.Variable(nonneg=True)
+        self.excess = cp.Parameter(n)
+        self.factor = cp.Parameter((n, n))
+        constraints = [
+            self.excess @ self.y == 1,
+            cp.sum(self.y) == self.kappa,
+            self.y >= 0,
+            cp.norm(self.y, 2) <= self.kappa / np.sqrt(n * diversification)
+        ]
+        self.problem = cp.Problem(cp.Minimize(cp.sum_squares(self.factor @ self.y)), constraints)
+
+    def solve(self, mean_returns, cov_matrix, risk_free_rate):
+        if not (mean_returns > risk_free_rate).any():
+            return None
+        self.excess.value = mean_returns - risk_free_rate
+        self.factor.value = covariance_factor(cov_matrix)
+        self.problem.solve(warm_start=True)
+        if self.problem.status not in ("optimal", "optimal_inaccurate") or not self.kappa.value:
+            return None
+        return np.clip(self.y.value / self.kappa.value, 0, None)
+
+
+def _optimize_dates(strategy, items):
+    return [(date, *strategy.optimize_weights(mean_returns, cov_matrix)) for date, (mean_returns, cov_matrix) in items]
+
 
 class Markowitz(BaseStrategy):
-    def __init__(self, assets):
-        super().__init__()
+    def __init__(self, assets, data_handler=None, lookback_window=None, diversification=None, save_outputs=True,
+                 start=None, end=None):
+        super().__init__(start=start, end=end)
         self.config = load_yaml('config/markowitz.yaml')
         self.name = "Markowitz Strategy"
         self.allocation_window = self.config["rebalance_window"]
-        self.lookback_window = self.config["lookback_window"]
+        # Paramètres du YAML, surchargeables (walk-forward)
+        self.lookback_window = self.config["lookback_window"] if lookback_window is None else lookback_window
         self.risk_free_rate = self.config["risk_free_rate"]
-        self.diversification = self.config["diversification"]
-        self.data_handler = DataHandler(data_path = "data/etf.pkl")
-        self.dates = self.data_handler.get(assets[0], start=self.start, end=self.end).index
+        self.diversification = self.config["diversification"] if diversification is None else diversification
+        self.save_outputs = save_outputs
+        # "exact" : portefeuille tangent en un seul problème ; "grid" : balayage de 100 gammas
+        self.sharpe_mode = self.config.get("sharpe_mode", "exact")
+        self.data_handler = data_handler or get_data_handler("data/etf.pkl")
+        self.dates = self.data_handler.trading_dates(self.start, self.end)
         self.assets = assets
         
 
     
-    def generate_orders(self, plot=False):
+    def __getstate__(self):
+        # Copie envoyée aux workers : configuration seulement, ni données ni problèmes compilés
+        state = self.__dict__.copy()
+        for key in ("data_handler", "_qp", "_sharpe_qp"):
+            state.pop(key, None)
+        return state
+
+    def weights_key(self):
+        """
+        Empreinte des entrées de la phase 1 (actifs, dates, fenêtres, contraintes, données).
+        """
+        handler = self.data_handler
+        payload = {
+            # Contenu du pickle : (poids, frontière)
+            "format": 3,
+            "assets": list(self.assets),
+            "dates": hashlib.sha256(self.dates.asi8.tobytes()).hexdigest(),
+            "windows": [self.allocation_window, self.lookback_window],
+            "risk_free_rate": self.risk_free_rate,
+            "diversification": self.diversification,
+            "sharpe_mode": self.sharpe_mode,
+            "data": data_fingerprint(handler.data_path, handler.compact),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def target_weights(self, max_workers=1, use_cache=True):
+        """
+        Phase 1 : poids cibles de chaque date de rebalancement. Ils ne dépendent que des
+        prix de la fenêtre d'estimation ; le résultat est enregistré dans WEIGHTS_DIR
+        pour être rejoué sans nouvelle estimation ni optimisation.
+        En série par défaut ; max_workers > 1 (None = tous les cœurs) répartit les dates
+        en blocs contigus (warm start à l'intérieur d'un bloc) sur un pool de processus,
+        utile seulement pour de longs historiques à rebalancement fréquent.
+        """
+        path = os.path.join(WEIGHTS_DIR, f"{self.weights_key()}.pkl") if self.data_handler.data_path else None
+        if use_cache and path and os.path.isfile(path):
+            return pd.read_pickle(path)
+
+        pre_start = self.start - pd.Timedelta(days=self.lookback_window*2)
+        prices_df = self.data_handler.get_multiple_df(list(self.assets), price='Adj Close', start=pre_start)
+        moments = self.rolling_moments(prices_df)
+
+        items = list(moments.items())
+        n_workers = min(max_workers or os.cpu_count() or 1, len(items))
+        if n_workers <= 1:
+            rows = _optimize_dates(self, items)
+        else:
+            chunks = [items[k[0]:k[-1] + 1] for k in np.array_split(np.arange(len(items)), n_workers)]
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                rows = [row for part in pool.map(_optimize_dates, [self] * len(chunks), chunks) for row in part]
+
+        weights_df = pd.DataFrame(
+            [weights for _, weights, _, _ in rows], columns=list(self.assets),
+            index=pd.DatetimeIndex([date for date, _, _, _ in rows], name='date')
+        )
+        weights_df["sharpe"] = [sharpe for _, _, sharpe, _ in rows]
+        weights_df["gamma"] = [gamma for _, _, _, gamma in rows]
+        if path:
+            os.makedirs(WEIGHTS_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            pd.to_pickle(weights_df, tmp_path)
+            os.replace(tmp_path, path)
+        return weights_df
+
+    def replay(self, weights_df, cost_model=None):
+        """
+        Phase 2 : rejoue les poids cibles dans le moteur d'exécution (dimensionnement
+        par la valeur du portefeuille, frais, slippage). Changer capital ou cost_model
+        ne demande pas de nouvelle optimisation.
+        Retourne le portefeuille, les ordres, les ordres exécutés, les frais totaux et l'analyseur.
+        """
         orders = {} 
-        gamma_series = {}
-        mask = [i % self.allocation_window == 0 for i in range(len(self.dates))]
-        reallocation_dates = self.dates[mask]
         pre_start = self.start - pd.Timedelta(days=self.lookback_window*2)   
         prices_df = self.data_handler.get_multiple_df(list(self.assets), price='Adj Close', start=pre_start)    
-        prices_df_open = self.data_handler.get_multiple_df(list(self.assets), price='Open', start=pre_start)  
         weights_hist = [[0]*len(self.assets)]
-        portfolio = Portfolio(symbols=self.assets, data_handler=self.data_handler, strategy=self)
-        executor = OrderExecutor(data_handler=self.data_handler)
+        target = weights_df[list(self.assets)]
+        portfolio = ArrayPortfolio(symbols=self.assets, data_handler=self.data_handler, strategy=self, dates=self.dates)
+        executor = OrderExecutor(data_handler=self.data_handler, cost_model=cost_model)
         total_fees = 0
         executed_orders = {}
         for i, date in enumerate(tqdm(self.dates[:-1], desc="Backtesting")):
             next_date = self.dates[i+1]
             day_orders = []
-            idx = prices_df[self.assets[0]].index.get_loc(date)
-            past_date = prices_df[self.assets[0]].index[idx - self.lookback_window]
-            if date in reallocation_dates:
-                valid_dates = prices_df.index[prices_df.index <= date]
-                last_30_days = valid_dates[-self.lookback_window:]
-                data = prices_df.loc[last_30_days]
+            if date in target.index:
+                weights = target.loc[date].to_numpy()
                 prev_weights = weights_hist[-1]
-                weights, sharpe, gamma = self.optimize_sharpe(data)
-                gamma_series[date] = gamma
                 delta_weights = np.round(weights - prev_weights,2)
                 for j, asset in enumerate(self.assets):
                     price = prices_df[asset].loc[date]
-                    price_open = prices_df_open[asset].loc[next_date]
-                    if delta_weights[j] < 0:
-                        action = 'sell'
-                        day_orders.append({'symbol': asset, 'action': action, 'size': delta_weights[j]*portfolio.value/price})
-                    else:
-                        action = 'buy'
-                        day_orders.append({'symbol': asset, 'action': action, 'size': delta_weights[j]*portfolio.value/price})
+                    action = 'sell' if delta_weights[j] < 0 else 'buy'
+                    day_orders.append({'symbol': asset, 'action': action, 'size': delta_weights[j]*portfolio.value/price})
                 orders[next_date] = day_orders  
                 weights_hist.append(weights) 
             day_orders = orders.get(date,[])
@@ -71,8 +226,21 @@ class Markowitz(BaseStrategy):
             total_fees += sum(order.get("fee", 0.0) for order in executed[date])
             executed_orders[date] = executed[date]      
             portfolio.update(date, executed)           
-        portfolio_df = portfolio.get_history()
+        portfolio_df = portfolio.get_history(to_csv=self.save_outputs)
         analyzer = PerformanceAnalyzer(self.data_handler, portfolio_df, orders, strategy=self)
+        return portfolio_df, orders, executed_orders, total_fees, analyzer
+
+    def simulate(self, max_workers=1):
+        """
+        Backtest seul (sans benchmark ni affichage) : phase 1 (poids cibles) puis
+        phase 2 (rejeu). Retourne le portefeuille, les ordres, les ordres exécutés,
+        les frais totaux et l'analyseur.
+        """
+        return self.replay(self.target_weights(max_workers=max_workers))
+
+    def generate_orders(self, plot=False, max_workers=1):
+        weights_df = self.target_weights(max_workers=max_workers)
+        portfolio_df, orders, executed_orders, total_fees, analyzer = self.replay(weights_df)
         stats = analyzer.compute_statistics(total_fees)
         stats_df = pd.DataFrame.from_dict(stats, orient='index', columns=["Portefeuille"])
         benchmark_portfolio_df, benchmark_stats_df = self.run_benchmark(preset='SPY')
@@ -83,57 +251,127 @@ class Markowitz(BaseStrategy):
         print(table)
         if plot:
             analyzer.plot(benchmark_portfolio_df['value'])
+            from utils.excel_export import export_backtest_to_excel
+            export_backtest_to_excel(
+                filepath=f"output/{self.name}/Backtest_Report.xlsx",
+                summary_stats=all_stats,
+                equity_df=portfolio_df,
+                weights_df=weights_df,
+                ohlc_data=self.data_handler.get_multiple(list(self.assets)),
+                trades_df=None,
+                frontier_df=self.final_frontier()
+            )
         return all_stats
         
-    def run_backtest(self, plot=False):
-        return self.generate_orders(plot=plot)
+    def run_backtest(self, plot=False, max_workers=1):
+        return self.generate_orders(plot=plot, max_workers=max_workers)
         
      
     def markowitz_optimize(self, gamma, mean_returns, cov_matrix):
-        n = len(mean_returns)
-        w = cp.Variable(n)
-        
-        global_mean = mean_returns.mean()
-        shrinkage_level = 0.5
-        shrunk_returns = (1 - shrinkage_level) * mean_returns + shrinkage_level * global_mean
-        expected_returns = w @ shrunk_returns
-        variance = cp.quad_form(w, cov_matrix)
-        objective = cp.Minimize(variance - gamma * expected_returns)
-        
-        div_proxy = n * cp.sum_squares(w)
-        constraints = [
-            cp.sum(w) == 1,
-            w >= 0,
-            div_proxy <= 1/self.diversification
-        ]
-        
-        problem = cp.Problem(objective, constraints)
-        problem.solve()
-        weights = w.value
-        return weights
+        qp = self.markowitz_problem(len(mean_returns))
+        qp.set_moments(mean_returns, cov_matrix)
+        return qp.solve(gamma)
+
+    def markowitz_problem(self, n):
+        """
+        Problème compilé une seule fois par nombre d'actifs, réutilisé à chaque rebalancement.
+        """
+        if getattr(self, "_qp", None) is None or self._qp.n != n:
+            self._qp = MarkowitzQP(n, self.diversification)
+        return self._qp
     
-    def optimize_sharpe(self, data):
+    def estimate_moments(self, data):
         returns = data.pct_change().dropna()
         lw = LedoitWolf().fit(returns.values)
         cov_matrix = lw.covariance_ * 252
         mean_returns = returns.mean().values * 252
+        return mean_returns, cov_matrix
+
+    def rebalance_dates(self):
+        return self.dates[:-1][::self.allocation_window]
+
+    def rolling_moments(self, prices_df, rebalance_dates=None):
+        """
+        (mean_returns, cov_matrix) de chaque date de rebalancement (toutes par défaut),
+        calculés en une passe par RollingMoments (fenêtre glissante de lookback_window
+        prix, mise à jour incrémentale) au lieu d'un LedoitWolf().fit par date.
+        """
+        returns = prices_df.pct_change(fill_method=None).to_numpy()
+        rebalance_dates = self.rebalance_dates() if rebalance_dates is None else rebalance_dates
+        rows = prices_df.index.get_indexer(rebalance_dates)
+        estimates = RollingMoments(returns, self.lookback_window - 1).batch(rows)
+        return {date: estimates[row] for date, row in zip(rebalance_dates, rows)}
+
+    def optimize_sharpe(self, data):
+        return self.optimize_weights(*self.estimate_moments(data))
+
+    def optimize_weights(self, mean_returns, cov_matrix):
+        if self.sharpe_mode == "exact":
+            weights = self.max_sharpe_problem(len(mean_returns)).solve(mean_returns, cov_matrix, self.risk_free_rate)
+            if weights is not None:
+                return weights, self.portfolio_sharpe(weights, mean_returns, cov_matrix), None
+        return self.grid_sharpe(mean_returns, cov_matrix)
+
+    def portfolio_sharpe(self, weights, mean_returns, cov_matrix):
+        port_return = np.dot(weights, mean_returns)
+        port_vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
+        return (port_return - self.risk_free_rate) / port_vol if port_vol > 0 else -np.inf
+
+    def grid_sharpe(self, mean_returns, cov_matrix):
         gamma_list = np.linspace(0,1,100)
         best_sharpe = -np.inf
         best_weights = None
         best_gamma = None
+        qp = self.markowitz_problem(len(mean_returns))
+        qp.set_moments(mean_returns, cov_matrix)
         for gamma in gamma_list:
-            weights = self.markowitz_optimize(gamma, mean_returns, cov_matrix)
-            port_return = np.dot(weights, mean_returns)
-            port_vol = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights)))
-            sharpe = (port_return - self.risk_free_rate) / port_vol if port_vol > 0 else -np.inf
+            weights = qp.solve(gamma)
+            sharpe = self.portfolio_sharpe(weights, mean_returns, cov_matrix)
             if sharpe > best_sharpe:
                 best_sharpe = sharpe
                 best_weights = weights
                 best_gamma = gamma
         return best_weights, best_sharpe, best_gamma
+
+    def max_sharpe_problem(self, n):
+        if getattr(self, "_sharpe_qp", None) is None or self._sharpe_qp.n != n:
+            self._sharpe_qp = MaxSharpeQP(n, self.diversification)
+        return self._sharpe_qp
+
+    def efficient_frontier(self, mean_returns, cov_matrix, n_points=50):
+        """
+        Frontière efficiente pour des moments estimés (estimate_moments) : balayage de gamma (de la variance
+        minimale au rendement maximal) sur le problème compilé, chaque point partant
+        de la solution du précédent. Une ligne par point, poids inclus (onglet Frontier).
+        """
+        qp = self.markowitz_problem(len(mean_returns))
+        qp.set_moments(mean_returns, cov_matrix)
+        rows = []
+        for gamma in np.concatenate([[0.0], np.logspace(-3, 2, n_points - 1)]):
+            weights = qp.solve(gamma)
+            port_return = np.dot(weights, mean_returns)
+            port_vol = np.sqrt(np.dot(weights, np.dot(cov_matrix, weights)))
+            rows.append({
+                "gamma": gamma,
+                "Return (%)": port_return * 100,
+                "Volatility (%)": port_vol * 100,
+                "Sharpe": self.portfolio_sharpe(weights, mean_returns, cov_matrix),
+                **{asset: w for asset, w in zip(self.assets, np.round(weights, 4))},
+            })
+        frontier = pd.DataFrame(rows)
+        return frontier.drop_duplicates(subset=list(self.assets)).sort_values("Volatility (%)").reset_index(drop=True)
         
 
+    def final_frontier(self, n_points=50):
+        """
+        Frontière efficiente des moments de la dernière date de rebalancement, calculée
+        seulement pour l'export Excel (onglet Frontier). None sans rebalancement.
+        """
+        pre_start = self.start - pd.Timedelta(days=self.lookback_window*2)
+        prices_df = self.data_handler.get_multiple_df(list(self.assets), price='Adj Close', start=pre_start)
+        moments = self.rolling_moments(prices_df, self.rebalance_dates()[-1:])
+        return self.efficient_frontier(*moments.popitem()[1], n_points=n_points) if moments else None
+
     def run_benchmark(self, preset='SPY'):
-        strategy = BuyAndHold(preset=preset)
-        return strategy.run_benchmark(preset=preset)
+        return cached_benchmark(preset=preset)
             
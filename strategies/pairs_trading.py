@@ -1,104 +1,63 @@
-import statsmodels.api as sm
 from strategies.base import BaseStrategy
-from utils.backtest_utils import DataHandler
+from utils.backtest_utils import get_data_handler
 import pandas as pd
-from core.portfolio import Portfolio
-from core.execution import OrderExecutor
+from core.portfolio import ArrayPortfolio
+from core.execution import OrderExecutor, orders_to_book, book_to_orders
 from core.compute_performance import PerformanceAnalyzer
+from core.vectorized import VectorizedBacktester
 from tabulate import tabulate
-from strategies.buy_and_hold import BuyAndHold
+from utils.benchmark_cache import cached_benchmark
 import sys 
 import os
 import json
 import numpy as np
 from utils.options_utils import load_yaml
+from utils.rolling_stats import rolling_ols
+from utils.signals import hysteresis_signals
 
 class PairsTradingStrategy(BaseStrategy):
-    def __init__(self, pair):
-        super().__init__()
+    def __init__(self, pair, data_handler=None, window=None, z_enter=None, z_exit=None, save_outputs=True,
+                 start=None, end=None):
+        super().__init__(start=start, end=end)
         self.name = "Pairs Trading Strategy"
         self.config = load_yaml("config/pairs_trading.yaml")
         self.pair   = pair
-        self.window  = self.config["window"]
-        self.z_enter = self.config["z_enter"]
-        self.z_exit  = self.config["z_exit"]
-        self.data_handler =  DataHandler(data_path = "data/s&p500.pkl")
+        # Paramètres du YAML, surchargeables (balayages de paramètres)
+        self.window  = self.config["window"] if window is None else window
+        self.z_enter = self.config["z_enter"] if z_enter is None else z_enter
+        self.z_exit  = self.config["z_exit"] if z_exit is None else z_exit
+        self.save_outputs = save_outputs
+        self.data_handler = data_handler or get_data_handler("data/s&p500.pkl")
     
     def generate_signals(self):     
         s1, s2 = self.pair
         df = self.compute_z_score()
-        z = df['z_score']
-        short = {}
-        long = {}
-        exit = {}
-        in_position = False
-        for current_date in z.index:
-            if not in_position:
-                if z.loc[current_date] > self.z_enter:
-                    short[current_date] = True
-                    long[current_date] = False
-                    exit[current_date] = False
-                    in_position = True
-                elif z.loc[current_date] < -self.z_enter:
-                    short[current_date] = False
-                    long[current_date] = True
-                    exit[current_date] = False
-                    in_position = True 
-                else:
-                    short[current_date] = False
-                    long[current_date] = False
-                    exit[current_date] = False
-                    in_position = False 
-            else:
-                if abs(z.loc[current_date]) < self.z_exit: 
-                    short[current_date] = False
-                    long[current_date] = False
-                    exit[current_date] = True
-                    in_position = False
-                else:
-                    short[current_date] = False
-                    long[current_date] = False
-                    exit[current_date] = False
-                    in_position = True   
-        signals = pd.DataFrame({
-        "short": pd.Series(short),
-        "long": pd.Series(long),
-        "exit": pd.Series(exit),
-        })     
+        signals = hysteresis_signals(df['z_score'].to_numpy(), self.z_enter, self.z_exit)
+        signals = pd.DataFrame({k: signals[k] for k in ("short", "long", "exit")}, index=df.index)
         df = df.join(signals, how='left')
         data = self.data_handler.get_multiple([s1, s2], price='Close')
         df1, df2 = data[s1], data[s2]
         df["close_1"] = df1.loc[df.index]
         df["close_2"] = df2.loc[df.index]
-        df.to_csv(f'output/{self.name}/{s1}_{s2}_signals.csv')
+        if self.save_outputs:
+            df.to_csv(f'output/{self.name}/{s1}_{s2}_signals.csv')
         return df
 
 
     def compute_spread(self):
+        """
+        Spread et bêta de la régression glissante close2 ~ close1 sur `window` jours,
+        calculés en une passe (utils.rolling_stats.rolling_ols). L'historique chargé
+        avant start se limite aux 2*(window-1) séances nécessaires au spread puis au z-score.
+        """
         s1, s2 = self.pair
-        spread = {}
-        betas = {}
-        pre_start = self.start - pd.Timedelta(days=2*365)
-        df = self.data_handler.get_multiple([s1, s2], start=pre_start, end=self.end)
-        df1, df2 = df[s1], df[s2]
-        dates = df1.index[self.window-1:]
-        for i, current_date in enumerate(dates, start=self.window):
-            close1 = df1['Close'].iloc[i - self.window : i]
-            close2 = df2['Close'].iloc[i - self.window : i]   
-            X_reg   = sm.add_constant(close1)
-            model = sm.OLS(close2, X_reg).fit()
-            beta = model.params.iloc[1]
-            alpha = model.params.iloc[0]
-            spread_val = close2.iloc[-1] - (alpha + beta * close1.iloc[-1])
-            spread[current_date] = spread_val
-            betas[current_date] = beta
-        df_result = pd.DataFrame({
-        "spread": pd.Series(spread),
-        "beta": pd.Series(betas)
-        })
-        df_result = df_result
+        calendar = self.data_handler.calendar()
+        lo = max(calendar.searchsorted(self.start, side="left") - 2 * (self.window - 1), 0)
+        df = self.data_handler.get_multiple_df([s1, s2], price='Close', start=calendar[lo], end=self.end)
+        _, beta, spread = rolling_ols(df[s1].to_numpy(), df[s2].to_numpy(), self.window)
+        df_result = pd.DataFrame({"spread": spread, "beta": beta}, index=df.index.rename(None)).iloc[self.window-1:]
         return df_result
-    
+
     def compute_z_score(self):
         df = self.compute_spread()
         df["z_score"] = (df["spread"] - df["spread"].rolling(self.window).mean()) / df["spread"].rolling(self.window).std()
@@ -106,54 +65,72 @@ class PairsTradingStrategy(BaseStrategy):
         df = df.loc[self.start:]
         return df
     
-    def generate_orders(self):
+    def generate_orders(self, signals=None):
         s1, s2 = self.pair
-        df = self.generate_signals()
+        df = self.generate_signals() if signals is None else signals
         orders = {}  
-        dates = df.index.to_list()
-        for i in range(len(dates)-1):
-            date = dates[i]
-            next_date = dates[i+1]
-            row = df.loc[date]
-            day_orders = []
-            beta = row['beta']
-            close1 = row['close_1']
-            close2 = row['close_2']
-            n_spread = self.capital/(close2+abs(beta)*close1)
-            exposure1 = n_spread * abs(beta) * close1
-            exposure2= n_spread * close2
-            qty1 = int(exposure1 / close1)
-            qty2 = int(exposure2 / close2)
-            if row["long"]:
-                day_orders.append({'symbol': s1, 'action': 'sell',  'size': qty1})
-                day_orders.append({'symbol': s2, 'action': 'buy', 'size': qty2})
-            elif row["short"]:
-                day_orders.append({'symbol': s1, 'action': 'buy', 'size': qty1})
-                day_orders.append({'symbol': s2, 'action': 'sell',  'size': qty2})
-            elif row["exit"]:
-                day_orders.append({'symbol': s1, 'action': 'exit', 'size': qty1})
-                day_orders.append({'symbol': s2, 'action': 'exit', 'size': qty2})
-            if day_orders:
-                orders[next_date] = day_orders
+        dates = df.index
+        beta = df['beta'].to_numpy()
+        close1 = df['close_1'].to_numpy()
+        close2 = df['close_2'].to_numpy()
+        n_spread = self.capital/(close2+np.abs(beta)*close1)
+        exposure1 = n_spread * np.abs(beta) * close1
+        exposure2 = n_spread * close2
+        qty1 = exposure1 / close1
+        qty2 = exposure2 / close2
+        long, short, exit = (df[k].to_numpy(dtype=bool) for k in ("long", "short", "exit"))
+        # Ordre passé à la séance suivante le signal (le dernier jour n'en génère pas)
+        for i in np.flatnonzero((long | short | exit)[:-1]):
+            size1, size2 = int(qty1[i]), int(qty2[i])
+            if long[i]:
+                day_orders = [{'symbol': s1, 'action': 'sell', 'size': size1},
+                              {'symbol': s2, 'action': 'buy', 'size': size2}]
+            elif short[i]:
+                day_orders = [{'symbol': s1, 'action': 'buy', 'size': size1},
+                              {'symbol': s2, 'action': 'sell', 'size': size2}]
+            else:
+                day_orders = [{'symbol': s1, 'action': 'exit', 'size': size1},
+                              {'symbol': s2, 'action': 'exit', 'size': size2}]
+            orders[dates[i+1]] = day_orders
         return orders
     
     
-    def run_backtest(self, plot=False, benchmark=True):
-        executor = OrderExecutor(data_handler=self.data_handler)
+    def simulate(self, engine="loop"):
+        """
+        Backtest seul (sans benchmark ni affichage) : retourne le portefeuille,
+        les ordres, les ordres exécutés et l'analyseur de performance.
+        engine="vectorized" rejoue les ordres sous forme de quantités cibles
+        avec VectorizedBacktester (les sorties paient alors frais et slippage).
+        """
         signals = self.generate_signals()
-        orders = self.generate_orders()
-        portfolio = Portfolio(symbols=self.pair, data_handler=self.data_handler, strategy=self)
-        date_range = pd.date_range(start=self.start, end=self.end)
+        orders = self.generate_orders(signals)
+        if engine == "vectorized":
+            backtester = VectorizedBacktester(
+                self.data_handler, self.pair, start=signals.index[0], end=signals.index[-1], order_time='Open'
+            )
+            portfolio_df = backtester.run_orders(orders)
+            if self.save_outputs:
+                portfolio_df.to_csv(f'output/{self.name}/portfolio.csv')
+            analyzer = PerformanceAnalyzer(self.data_handler, portfolio_df, orders, strategy=self)
+            return portfolio_df, orders, backtester.executed_orders(), analyzer
+        executor = OrderExecutor(data_handler=self.data_handler)
+        symbols = list(self.pair)
+        book = executor.execute_batch(
+            orders_to_book(orders, symbols, self.data_handler.date_rows()), symbols, order_time='Open'
+        )
+        executed_by_date = book_to_orders(book, symbols, self.data_handler.calendar())
+        portfolio = ArrayPortfolio(symbols=self.pair, data_handler=self.data_handler, strategy=self, dates=signals.index)
         executed_orders = {}
-        for date in date_range:
-            if date not in signals.index:
-                continue
-            orders_today = orders.get(date, [])
-            executed = executor.execute(orders_today, date, order_time='Open')
+        for date in signals.index:
+            executed = {date: executed_by_date.get(date, [])}
             executed_orders[date] = executed[date]
             portfolio.update(date, executed)
-        portfolio_df = portfolio.get_history()
+        portfolio_df = portfolio.get_history(to_csv=self.save_outputs)
         analyzer = PerformanceAnalyzer(self.data_handler, portfolio_df, orders, strategy=self)
+        return portfolio_df, orders, executed_orders, analyzer
+
+    def run_backtest(self, plot=False, benchmark=True):
+        portfolio_df, orders, executed_orders, analyzer = self.simulate()
         stats = analyzer.compute_statistics()
         stats_df = pd.DataFrame.from_dict(stats, orient='index', columns=["Portefeuille"])
         benchmark_portfolio_df, benchmark_stats_df = self.run_benchmark(preset='SPY')
@@ -169,7 +146,6 @@ class PairsTradingStrategy(BaseStrategy):
         
         
     def run_benchmark(self, preset='SPY'):
-        strategy = BuyAndHold(preset=preset)
-        return strategy.run_benchmark(preset=preset)
+        return cached_benchmark(preset=preset)
         
      
@@ -0,0 +1,12 @@
+import os
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    # Les chemins config/ et output/ du code sont relatifs à la racine du dépôt
+    monkeypatch.chdir(ROOT)
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+
+def make_prices(symbols, dates, seed=0, fields=("Adj Close", "Close", "High", "Low", "Open", "Volume")):
+    """
+    DataFrame (Ticker, Price) de prix synthétiques, au format des pickles de data/.
+    """
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for symbol in symbols:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        columns = {
+            "Adj Close": close, "Close": close, "High": close * 1.01, "Low": close * 0.99,
+            "Open": close * (1 + rng.normal(0, 0.002, len(dates))), "Volume": rng.integers(1e5, 1e6, len(dates)),
+        }
+        frames[symbol] = pd.DataFrame({f: columns[f] for f in fields}, index=dates)
+    df = pd.concat(frames, axis=1)
+    df.index.name = "Date"
+    df.columns.names = ["Ticker", "Price"]
+    return df
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.costs import CompositeCost, FlatCost, HighLowSpread, PerShareFee, SquareRootImpact
+from utils.backtest_utils import DataHandler
+from tests.helpers import make_prices
+
+SYMBOLS = ["AAA", "BBB"]
+DATES = pd.bdate_range("2024-01-01", periods=40)
+
+
+@pytest.fixture
+def prices():
+    return make_prices(SYMBOLS, DATES)
+
+
+@pytest.fixture
+def handler(tmp_path, prices):
+    path = str(tmp_path / "prices.pkl")
+    prices.to_pickle(path)
+    return DataHandler(path)
+
+
+def orders(rows, symbols, size):
+    return np.array(rows), np.array(symbols), np.array(size, dtype=np.float64)
+
+
+def test_flat_cost():
+    rows, symbols, size = orders([3, 5], [0, 1], [10, -4])
+    price = np.array([100.0, 50.0])
+    model = FlatCost(slippage=0.001, fee_rate=0.002)
+
+    np.testing.assert_allclose(model.slippage(rows, symbols, size, price), [0.001, 0.001])
+    np.testing.assert_allclose(model.fee(rows, symbols, size, price), [2.0, 0.4])
+
+
+def test_square_root_impact_scales_with_participation(handler, prices):
+    model = SquareRootImpact(coef=0.1, window=20).prepare(handler, SYMBOLS)
+    rows, symbols, size = orders([25, 25, 30], [0, 0, 1], [1000, 4000, -1000])
+
+    slippage = model.slippage(rows, symbols, size, np.full(3, 100.0))
+
+    # Quatre fois la taille : deux fois l'impact
+    assert slippage[1] == pytest.approx(2 * slippage[0])
+    for i, (row, symbol) in enumerate(zip(rows, symbols)):
+        data = prices[SYMBOLS[symbol]]
+        adv = data["Volume"].rolling(20, min_periods=1).mean().shift(1).iloc[row]
+        sigma = data["Close"].pct_change().rolling(20, min_periods=1).std().shift(1).iloc[row]
+        assert slippage[i] == pytest.approx(0.1 * sigma * np.sqrt(abs(size[i]) / adv))
+
+
+def test_square_root_impact_cap_and_first_row(handler):
+    model = SquareRootImpact(coef=0.1, max_impact=0.02).prepare(handler, SYMBOLS)
+    rows, symbols, size = orders([0, 25], [0, 1], [1000, 1e12])
+
+    slippage = model.slippage(rows, symbols, size, np.full(2, 100.0))
+
+    # Pas d'historique au premier jour : pas d'impact estimé
+    assert slippage[0] == 0
+    assert slippage[1] == 0.02
+
+
+def test_high_low_spread(handler):
+    # High / Low = Close * 1.01 / 0.99 : amplitude de 2 %
+    model = HighLowSpread(factor=0.5, window=20).prepare(handler, SYMBOLS)
+    rows, symbols, size = orders([0, 1, 10, 39], [0, 1, 0, 1], [10, 10, -10, 10])
+
+    slippage = model.slippage(rows, symbols, size, np.full(4, 100.0))
+
+    np.testing.assert_allclose(slippage, [0.0, 0.005, 0.005, 0.005])
+
+
+def test_per_share_fee():
+    model = PerShareFee(per_share=0.01, minimum=1.0, max_pct=0.01)
+    rows, symbols, size = orders([0] * 5, [0] * 5, [10, 1000, -1000, 1, 0])
+    price = np.array([100.0, 100.0, 0.5, 10.0, 100.0])
+
+    fee = model.fee(rows, symbols, size, price)
+
+    # Minimum, tarif par action, plafond en % du notionnel (y compris sur le minimum), ordre nul
+    np.testing.assert_allclose(fee, [1.0, 10.0, 5.0, 0.1, 0.0])
+    uncapped = PerShareFee(per_share=0.01, minimum=1.0, max_pct=None)
+    np.testing.assert_allclose(uncapped.fee(rows, symbols, size, price), [1.0, 10.0, 10.0, 1.0, 0.0])
+
+
+def test_composite_cost_sums_models(handler):
+    flat, spread, per_share = FlatCost(0.001, 0.002), HighLowSpread(), PerShareFee()
+    composite = flat + spread + per_share
+    rows, symbols, size = orders([5, 12, 30], [0, 1, 1], [100, -250, 0])
+    price = np.array([100.0, 80.0, 90.0])
+
+    prepared = composite.prepare(handler, SYMBOLS)
+
+    assert isinstance(composite, CompositeCost) and len(composite.models) == 3
+    assert prepared is not composite and composite.models[1]._handler is None
+    models = [model.prepare(handler, SYMBOLS) for model in composite.models]
+    np.testing.assert_allclose(
+        prepared.slippage(rows, symbols, size, price), sum(m.slippage(rows, symbols, size, price) for m in models)
+    )
+    np.testing.assert_allclose(
+        prepared.fee(rows, symbols, size, price), sum(m.fee(rows, symbols, size, price) for m in models)
+    )
+    assert prepared.fee(rows, symbols, size, price)[0] == pytest.approx(100 * 100 * 0.002 + 1.0)
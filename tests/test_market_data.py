@@ -0,0 +1,82 @@
+import functools
+import os
+import pandas as pd
+import utils.backtest_utils
+from utils.backtest_utils import DataHandler, ETF_TICKERS
+from utils.market_data import MarketDataUpdater, PickleFetcher
+from tests.helpers import make_prices
+
+DATES = pd.bdate_range("2024-01-01", periods=10)
+
+
+class FailingFetcher:
+    def __init__(self, source, failing):
+        self.source = PickleFetcher(source)
+        self.failing = failing
+        self.calls = 0
+
+    def fetch(self, ticker, start=None):
+        if ticker in self.failing:
+            self.calls += 1
+            raise ConnectionError(ticker)
+        return self.source.fetch(ticker, start)
+
+
+def test_update_appends_missing_tail(tmp_path):
+    source = make_prices(["AAA", "BBB"], DATES)
+    path = str(tmp_path / "prices.pkl")
+    source.iloc[:6].to_pickle(path)
+
+    report = MarketDataUpdater(path, fetcher=PickleFetcher(source)).update()
+
+    assert report == {"AAA": 4, "BBB": 4}
+    pd.testing.assert_frame_equal(pd.read_pickle(path), source, check_freq=False)
+
+
+def test_update_is_noop_when_up_to_date(tmp_path):
+    source = make_prices(["AAA"], DATES)
+    path = str(tmp_path / "prices.pkl")
+    source.to_pickle(path)
+    mtime = os.path.getmtime(path)
+
+    report = MarketDataUpdater(path, fetcher=PickleFetcher(source)).update()
+
+    assert report == {"AAA": 0}
+    assert os.path.getmtime(path) == mtime
+
+
+def test_update_reports_failures_after_retries(tmp_path):
+    source = make_prices(["AAA", "BBB"], DATES)
+    path = str(tmp_path / "prices.pkl")
+    source.iloc[:6].to_pickle(path)
+    fetcher = FailingFetcher(source, {"BBB"})
+    sleeps = []
+
+    report = MarketDataUpdater(path, fetcher=fetcher, retries=2, backoff=0.5, sleep=sleeps.append).update()
+
+    assert report["AAA"] == 4
+    assert isinstance(report["BBB"], ConnectionError)
+    assert fetcher.calls == 3
+    assert sleeps == [0.5, 1.0]
+    updated = pd.read_pickle(path)
+    assert updated["AAA"].index[-1] == DATES[-1]
+    assert updated["BBB"].dropna(how="all").index[-1] == DATES[5]
+
+
+def test_download_from_yf_keeps_file_universe(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        utils.backtest_utils, "MarketDataUpdater", functools.partial(MarketDataUpdater, sleep=lambda seconds: None)
+    )
+    source = make_prices(["AAA", "BBB", "SPY"], DATES)
+    path = str(tmp_path / "s&p500.pkl")
+    source[["AAA", "BBB"]].iloc[:6].to_pickle(path)
+    handler = DataHandler(path)
+    calendar = handler.calendar()
+
+    data, failed = handler.download_from_yf(fetcher=FailingFetcher(source, {"BBB"}), max_workers=2)
+
+    assert list(data.columns.get_level_values(0).unique()) == ["AAA", "BBB"]
+    assert not set(ETF_TICKERS) & set(data.columns.get_level_values(0))
+    assert list(failed) == ["BBB"]
+    # Le handler (partagé via get_data_handler) n'est pas modifié
+    assert handler.calendar() is calendar
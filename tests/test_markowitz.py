@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from strategies.markowitz import Markowitz
+from utils.backtest_utils import DataHandler
+from tests.helpers import make_prices
+
+ASSETS = ["AAA", "BBB", "CCC"]
+DATES = pd.bdate_range("2022-01-03", periods=300)
+MEAN = np.array([0.04, 0.08, 0.13])
+VOL = np.array([0.08, 0.15, 0.25])
+CORR = np.array([[1.0, 0.3, 0.1], [0.3, 1.0, 0.5], [0.1, 0.5, 1.0]])
+COV = CORR * np.outer(VOL, VOL)
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    path = str(tmp_path / "prices.pkl")
+    make_prices(ASSETS, DATES).to_pickle(path)
+    return Markowitz(
+        ASSETS, data_handler=DataHandler(path), lookback_window=60, save_outputs=False,
+        start=DATES[100], end=DATES[-1]
+    )
+
+
+def test_frontier_is_monotone(strategy):
+    frontier = strategy.efficient_frontier(MEAN, COV)
+
+    assert len(frontier) > 10
+    assert (np.diff(frontier["Volatility (%)"]) > 0).all()
+    assert (np.diff(frontier["Return (%)"]) > -1e-6).all()
+    assert np.allclose(frontier[ASSETS].sum(axis=1), 1, atol=1e-3)
+
+
+def test_frontier_max_sharpe_matches_qp(strategy):
+    frontier = strategy.efficient_frontier(MEAN, COV)
+    weights = strategy.max_sharpe_problem(len(MEAN)).solve(MEAN, COV, strategy.risk_free_rate)
+    sharpe = strategy.portfolio_sharpe(weights, MEAN, COV)
+
+    best = frontier.loc[frontier["Sharpe"].idxmax()]
+    # Le tangent est l'optimum exact : aucun point de la frontière ne le dépasse
+    assert sharpe >= frontier["Sharpe"].max() - 1e-6
+    assert best["Sharpe"] == pytest.approx(sharpe, rel=1e-3)
+    assert np.allclose(best[ASSETS].to_numpy(dtype=float), weights, atol=0.05)
+
+
+def test_final_frontier_uses_last_rebalance_moments(strategy):
+    pre_start = strategy.start - pd.Timedelta(days=strategy.lookback_window*2)
+    prices_df = strategy.data_handler.get_multiple_df(ASSETS, price='Adj Close', start=pre_start)
+    moments = strategy.rolling_moments(prices_df)
+
+    expected = strategy.efficient_frontier(*moments[max(moments)])
+
+    pd.testing.assert_frame_equal(strategy.final_frontier(), expected)
@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+import statsmodels.api as sm
+from sklearn.covariance import LedoitWolf
+from utils.rolling_stats import RollingMoments, rolling_ols
+
+RTOL = 1e-10
+
+
+def reference_ols(x, y, window):
+    # Régression sm.OLS fenêtre par fenêtre (ancienne implémentation de compute_spread)
+    alpha = np.full(len(x), np.nan)
+    beta = np.full(len(x), np.nan)
+    for t in range(window - 1, len(x)):
+        xs, ys = x[t - window + 1:t + 1], y[t - window + 1:t + 1]
+        if np.isnan(xs).any() or np.isnan(ys).any():
+            continue
+        alpha[t], beta[t] = sm.OLS(ys, sm.add_constant(xs)).fit().params
+    return alpha, beta, y - (alpha + beta * x)
+
+
+def assert_close(result, reference, y):
+    alpha, beta, spread = result
+    ref_alpha, ref_beta, ref_spread = reference
+    np.testing.assert_allclose(alpha, ref_alpha, rtol=RTOL, equal_nan=True)
+    np.testing.assert_allclose(beta, ref_beta, rtol=RTOL, equal_nan=True)
+    # Le spread (résidu) est proche de 0 : tolérance absolue à l'échelle des prix
+    np.testing.assert_allclose(spread, ref_spread, rtol=RTOL, atol=RTOL * np.nanmax(np.abs(y)), equal_nan=True)
+
+
+def price_paths(n, k, seed):
+    rng = np.random.default_rng(seed)
+    x = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n, k)), axis=0))
+    y = 5 + 1.3 * x + rng.normal(0, 1, (n, k))
+    return x, y
+
+
+@pytest.mark.parametrize("window", [5, 30])
+def test_matches_statsmodels(window):
+    x, y = price_paths(200, 1, seed=window)
+    assert_close(rolling_ols(x[:, 0], y[:, 0], window), reference_ols(x[:, 0], y[:, 0], window), y)
+
+
+def test_nan_windows():
+    x, y = price_paths(120, 1, seed=1)
+    x, y = x[:, 0], y[:, 0]
+    x[40] = np.nan
+    y[90] = np.nan
+    window = 20
+    result = rolling_ols(x, y, window)
+    beta = result[1]
+
+    assert np.isnan(beta[40:60]).all() and np.isnan(beta[90:110]).all()
+    assert np.isfinite(beta[60:90]).all() and np.isfinite(beta[110:]).all()
+    assert_close(result, reference_ols(x, y, window), y)
+
+
+def test_two_dimensional_input():
+    x, y = price_paths(150, 3, seed=2)
+    x[70, 1] = np.nan
+    window = 25
+    alpha, beta, spread = rolling_ols(x, y, window)
+
+    assert alpha.shape == beta.shape == spread.shape == x.shape
+    for j in range(x.shape[1]):
+        assert_close((alpha[:, j], beta[:, j], spread[:, j]), reference_ols(x[:, j], y[:, j], window), y[:, j])
+
+
+def test_short_series_and_invalid_window():
+    alpha, beta, spread = rolling_ols(np.arange(3.0), np.arange(3.0), 5)
+    assert np.isnan(alpha).all() and np.isnan(beta).all() and np.isnan(spread).all()
+    with pytest.raises(ValueError):
+        rolling_ols(np.arange(3.0), np.arange(3.0), 1)
+
+
+def reference_moments(values, window, t):
+    # LedoitWolf().fit par fenêtre (ancienne implémentation de Markowitz.estimate_moments)
+    rows = values[max(t - window + 1, 0):t + 1]
+    rows = rows[~np.isnan(rows).any(axis=1)]
+    return rows.mean(axis=0) * 252, LedoitWolf().fit(rows).covariance_ * 252
+
+
+def return_paths(n, p, seed):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.01, (n, p)) + rng.normal(0, 0.008, (n, 1))
+    returns[0] = np.nan
+    returns[[45, 46, 130], [1, 1, 3]] = np.nan
+    return returns
+
+
+@pytest.mark.parametrize("refresh", [None, 30])
+def test_rolling_moments_match_ledoit_wolf(refresh):
+    returns = return_paths(300, 5, seed=3)
+    window = 60
+    rows = [10, 59, 60, 80, 105, 140, 175, 299]
+    estimates = RollingMoments(returns, window, refresh=refresh).batch(rows)
+
+    for t in rows:
+        mean, cov = estimates[t]
+        ref_mean, ref_cov = reference_moments(returns, window, t)
+        np.testing.assert_allclose(mean, ref_mean, rtol=1e-9)
+        np.testing.assert_allclose(cov, ref_cov, rtol=1e-9)
+
+
+def test_rolling_moments_out_of_order():
+    returns = return_paths(200, 4, seed=4)
+    moments = RollingMoments(returns, 40)
+    # Recul et saut de fenêtre : recalcul complet
+    for t in [150, 60, 61, 199, 100]:
+        mean, cov = moments.estimate(t)
+        ref_mean, ref_cov = reference_moments(returns, 40, t)
+        np.testing.assert_allclose(mean, ref_mean, rtol=1e-9)
+        np.testing.assert_allclose(cov, ref_cov, rtol=1e-9)
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from utils.signals import hysteresis_signals
+
+
+def reference_signals(z, z_enter, z_exit):
+    # Boucle d'origine de PairsTradingStrategy.generate_signals, plus le sens de la position
+    n = len(z)
+    short, long, exit = np.zeros(n, bool), np.zeros(n, bool), np.zeros(n, bool)
+    position = np.zeros(n)
+    in_position, side = False, 0.0
+    for t in range(n):
+        if not in_position:
+            if z[t] > z_enter:
+                short[t], in_position, side = True, True, -1.0
+            elif z[t] < -z_enter:
+                long[t], in_position, side = True, True, 1.0
+        elif abs(z[t]) < z_exit:
+            exit[t], in_position, side = True, False, 0.0
+        position[t] = side
+    return {"short": short, "long": long, "exit": exit, "position": position}
+
+
+def z_paths(n, k, seed):
+    # AR(1) autour de 0, arrondi au quart pour tomber aussi sur les seuils exacts
+    rng = np.random.default_rng(seed)
+    z = np.zeros((n, k))
+    for t in range(1, n):
+        z[t] = 0.9 * z[t - 1] + rng.normal(0, 0.8, k)
+    return np.round(z * 4) / 4
+
+
+THRESHOLDS = [(2.0, 0.5), (1.5, 0.0), (1.0, 1.0), (0.5, 1.5)]
+
+
+@pytest.mark.parametrize("z_enter, z_exit", THRESHOLDS)
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_loop_1d(z_enter, z_exit, seed):
+    z = z_paths(500, 1, seed)[:, 0]
+    signals = hysteresis_signals(z, z_enter, z_exit)
+    expected = reference_signals(z, z_enter, z_exit)
+    for key in ("short", "long", "exit", "position"):
+        assert signals[key].shape == z.shape
+        np.testing.assert_array_equal(signals[key], expected[key], err_msg=key)
+
+
+@pytest.mark.parametrize("z_enter, z_exit", THRESHOLDS)
+def test_matches_loop_2d(z_enter, z_exit):
+    z = z_paths(400, 6, seed=42)
+    signals = hysteresis_signals(z, z_enter, z_exit)
+    for key in ("short", "long", "exit", "position"):
+        assert signals[key].shape == z.shape
+    for j in range(z.shape[1]):
+        expected = reference_signals(z[:, j], z_enter, z_exit)
+        for key in ("short", "long", "exit", "position"):
+            np.testing.assert_array_equal(signals[key][:, j], expected[key], err_msg=f"{key}[{j}]")
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from core.costs import FlatCost
+from core.vectorized import VectorizedBacktester, orders_to_targets
+from utils.backtest_utils import DataHandler
+from tests.helpers import make_prices
+
+DATES = pd.bdate_range("2024-01-01", periods=8)
+
+
+def make_backtester(tmp_path, gaps):
+    prices = make_prices(["AAA", "BBB"], DATES)
+    for row in gaps:
+        prices.loc[DATES[row], "BBB"] = np.nan
+    path = str(tmp_path / "prices.pkl")
+    prices.to_pickle(path)
+    backtester = VectorizedBacktester(
+        DataHandler(path), ["AAA", "BBB"], start=DATES[0], end=DATES[-1], cost_model=FlatCost()
+    )
+    return backtester, prices
+
+
+def test_target_on_unquoted_day_executes_next_quoted_day(tmp_path):
+    backtester, prices = make_backtester(tmp_path, gaps=[3])
+    targets = pd.DataFrame(np.nan, index=DATES, columns=["AAA", "BBB"])
+    targets.loc[DATES[3], "BBB"] = 10
+
+    portfolio_df = backtester.run(targets)
+
+    assert list(portfolio_df["BBB_qty"]) == [0, 0, 0, 0, 10, 10, 10, 10]
+    open_price = prices.loc[DATES[4], ("BBB", "Open")]
+    assert portfolio_df["cash"].iloc[4] == round(backtester.capital - 10 * open_price, 2)
+    assert np.flatnonzero(backtester.trades[:, 1]).tolist() == [4]
+
+
+def test_pending_target_replaced_before_next_quote(tmp_path):
+    backtester, _ = make_backtester(tmp_path, gaps=[3, 4])
+    targets = pd.DataFrame(np.nan, index=DATES, columns=["AAA", "BBB"])
+    targets.loc[DATES[3], "BBB"] = 10
+    targets.loc[DATES[4], "BBB"] = 20
+
+    portfolio_df = backtester.run(targets)
+
+    assert list(portfolio_df["BBB_qty"]) == [0, 0, 0, 0, 0, 20, 20, 20]
+
+
+def test_orders_on_unquoted_day_are_not_lost(tmp_path):
+    backtester, _ = make_backtester(tmp_path, gaps=[3])
+    orders = {
+        DATES[1]: [{'symbol': 'AAA', 'action': 'buy', 'size': 5}],
+        DATES[3]: [{'symbol': 'BBB', 'action': 'buy', 'size': 10}],
+        DATES[6]: [{'symbol': 'BBB', 'action': 'sell', 'size': 4}, {'symbol': 'AAA', 'action': 'exit', 'size': 5}],
+    }
+
+    portfolio_df = backtester.run_orders(orders)
+
+    assert list(portfolio_df["AAA_qty"]) == [0, 5, 5, 5, 5, 5, 0, 0]
+    assert list(portfolio_df["BBB_qty"]) == [0, 0, 0, 0, 10, 10, 6, 6]
+    targets = orders_to_targets(orders, ["AAA", "BBB"], DATES)
+    assert targets.loc[DATES[6], "BBB"] == 6
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+from utils.walk_forward import stitch_portfolios, walk_forward_folds
+
+DATES = pd.bdate_range("2024-01-01", periods=20)
+
+
+def test_rolling_folds():
+    folds = walk_forward_folds(DATES, train_size=8, test_size=5)
+
+    assert folds == [
+        (DATES[0], DATES[7], DATES[8], DATES[12]),
+        (DATES[5], DATES[12], DATES[13], DATES[17]),
+    ]
+
+
+def test_anchored_folds():
+    folds = walk_forward_folds(DATES, train_size=8, test_size=5, anchored=True)
+
+    assert [fold[0] for fold in folds] == [DATES[0], DATES[0]]
+    assert [fold[1:] for fold in folds] == [
+        (DATES[7], DATES[8], DATES[12]),
+        (DATES[12], DATES[13], DATES[17]),
+    ]
+
+
+@pytest.mark.parametrize("n_dates, n_folds", [(18, 2), (17, 1), (12, 0), (13, 1)])
+def test_trailing_partial_fold_dropped(n_dates, n_folds):
+    folds = walk_forward_folds(DATES[:n_dates], train_size=8, test_size=5)
+
+    assert len(folds) == n_folds
+    for _, _, test_start, test_end in folds:
+        assert DATES.get_loc(test_end) - DATES.get_loc(test_start) + 1 == 5
+
+
+def test_stitch_portfolios_chains_fold_values():
+    first = pd.DataFrame(
+        {"cash": [100.0, 40.0], "value": [100.0, 110.0], "AAA_qty": [0.0, 2.0], "AAA": [0.0, 70.0]},
+        index=DATES[:2],
+    )
+    second = pd.DataFrame(
+        {"cash": [100.0, 20.0], "value": [100.0, 120.0], "BBB_qty": [0.0, 4.0], "BBB": [0.0, 100.0]},
+        index=DATES[2:4],
+    )
+
+    stitched = stitch_portfolios([first, second], capital=100.0)
+
+    assert list(stitched.index) == list(DATES[:4])
+    assert stitched["value"].tolist() == pytest.approx([100.0, 110.0, 110.0, 132.0])
+    assert stitched["cash"].tolist() == pytest.approx([100.0, 40.0, 110.0, 22.0])
+    assert stitched["BBB_qty"].tolist() == pytest.approx([0.0, 0.0, 0.0, 4.4])
+    assert stitched["AAA"].tolist() == pytest.approx([0.0, 70.0, 0.0, 0.0])
+
+
+def test_stitch_portfolios_rescales_first_fold_to_capital():
+    fold = pd.DataFrame({"cash": [50.0, 50.0], "value": [50.0, 55.0]}, index=DATES[:2])
+
+    stitched = stitch_portfolios([fold], capital=1000.0)
+
+    assert stitched["value"].tolist() == pytest.approx([1000.0, 1100.0])
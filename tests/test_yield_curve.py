@@ -0,0 +1,62 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+import utils.options_utils as options_utils
+import utils.yield_curve as yield_curve
+from utils.yield_curve import YieldCurve, get_yield_curve
+
+
+@pytest.fixture
+def riskfree_csv(tmp_path, monkeypatch):
+    path = str(tmp_path / "riskfree.csv")
+    pd.DataFrame({
+        "date": ["2024-01-02"] * 3 + ["2024-01-03"] * 3,
+        "tenor": ["1M", "1Y", "10Y"] * 2,
+        "rate": [1.0, 2.0, 3.0, 1.5, 2.5, 3.5],
+    }).to_csv(path, index=False)
+    monkeypatch.setattr(yield_curve, "_CURVES", {})
+    monkeypatch.setattr(options_utils, "RISKFREE_CSV", path)
+    loads = []
+    from_csv = YieldCurve.from_csv.__func__
+
+    def counting_from_csv(cls, csv_path=yield_curve.RISKFREE_CSV, method="linear"):
+        loads.append(csv_path)
+        return from_csv(cls, csv_path, method)
+
+    monkeypatch.setattr(YieldCurve, "from_csv", classmethod(counting_from_csv))
+    return path, loads
+
+
+def test_curve_loaded_once_across_methods(riskfree_csv):
+    path, loads = riskfree_csv
+    chain = pd.DataFrame({"date": ["2024-01-02", "2024-01-03"], "tau": [0.5, 2.0]})
+    for _ in range(5):
+        assert options_utils.get_riskfree_rate("2024-01-03", 0.9) == 2.5
+        options_utils.add_riskfree_rates(chain, method="linear")
+
+    assert len(loads) == 1
+    expected = [np.interp(0.5, [30 / 365, 1, 10], [1, 2, 3]), np.interp(2.0, [30 / 365, 1, 10], [1.5, 2.5, 3.5])]
+    np.testing.assert_allclose(chain["r"], expected)
+
+
+def test_curve_reloaded_when_file_changes(riskfree_csv):
+    path, loads = riskfree_csv
+    get_yield_curve(path)
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    get_yield_curve(path)
+    get_yield_curve(path)
+
+    assert len(loads) == 2
+    assert len(yield_curve._CURVES) == 1
+
+
+def test_rate_methods_and_validation(riskfree_csv):
+    path, _ = riskfree_csv
+    curve = get_yield_curve(path)
+
+    assert curve.rate("2024-01-02", 0.9, method="nearest") == 2.0
+    assert curve.rate("2024-01-02", 5.5, method="linear") == pytest.approx(2.5)
+    with pytest.raises(ValueError):
+        curve.rate("2024-01-02", 1.0, method="spline")
@@ -1,11 +1,159 @@
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import os
+import threading
+from utils.price_store import MANIFEST, MAX_RESIDENT_SYMBOLS, convert_pickle, is_store, open_store, store_path_for
+from utils.market_data import MarketDataUpdater
+
+ETF_TICKERS = [
+    # ▶️ Indices US
+    "SPY", "VOO", "VTI", "IVV", "QQQ", "DIA", "IWM",
+    # ▶️ Marchés internationaux
+    "VEA", "IEFA", "ACWI", "VT", "VXUS",
+    # ▶️ Pays émergents
+    "EEM", "VWO", "IEMG", "EMXC",
+    # ▶️ Obligations
+    "BND", "AGG", "TLT", "LQD", "HYG", "IEF", "SHY", "SGOV", "BIL", "SHV",
+    # ▶️ Secteurs US
+    "XLK", "XLF", "XLV", "XLY", "XLE", "XLI", "XLB", "XLU", "XLRE", "XLC",
+    # ▶️ Matières premières
+    "GLD", "SLV", "DBC", "USO", "DBA", "PPLT", "CPER",
+    # ▶️ Immobilier
+    "VNQ", "IYR", "SCHH", "REET",
+    # ▶️ Stratégies / Facteurs
+    "SPLV", "USMV", "MTUM", "QUAL", "VIG", "DVY", "RSP", "SPHD",
+    # ▶️ Devise / hedging
+    "UUP", "FXE", "FXF"
+]
+
+_REGISTRY = {}
+_REGISTRY_STATS = {"hits": 0, "misses": 0}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def data_fingerprint(data_path, compact=False):
+    """
+    Empreinte (chemin absolu, mtime) du fichier de données et de son store éventuel.
+    """
+    path = os.path.abspath(data_path)
+    mtimes = [os.path.getmtime(path)] if os.path.isfile(path) else []
+    store_path = path if is_store(path) else store_path_for(path, compact)
+    if is_store(store_path):
+        mtimes.append(os.path.getmtime(os.path.join(store_path, MANIFEST)))
+    return path, max(mtimes, default=None)
+
+
+def get_data_handler(data_path, compact=False):
+    """
+    Retourne le DataHandler partagé (lecture seule) pour data_path.
+    Un seul chargement par (chemin, mtime) pour tout le processus : stratégies,
+    benchmarks et relances depuis les onglets. Un fichier modifié est rechargé.
+    """
+    path, mtime = data_fingerprint(data_path, compact)
+    with _REGISTRY_LOCK:
+        handler = _REGISTRY.get((path, mtime, compact))
+        if handler is not None:
+            _REGISTRY_STATS["hits"] += 1
+            return handler
+        _REGISTRY_STATS["misses"] += 1
+        for key in [key for key in _REGISTRY if key[0] == path and key[2] == compact]:
+            del _REGISTRY[key]
+        handler = DataHandler(data_path=data_path, compact=compact)
+        _REGISTRY[(path, mtime, compact)] = handler
+        return handler
+
+
+def data_registry_stats():
+    with _REGISTRY_LOCK:
+        handlers = list(_REGISTRY.values())
+        return {
+            "hits": _REGISTRY_STATS["hits"],
+            "misses": _REGISTRY_STATS["misses"],
+            "entries": len(handlers),
+            "bytes_resident": sum(h.resident_bytes() for h in handlers),
+            "bytes_mapped": sum(h.mapped_bytes() for h in handlers),
+        }
+
+
+def clear_data_registry():
+    with _REGISTRY_LOCK:
+        _REGISTRY.clear()
+        _REGISTRY_STATS.update(hits=0, misses=0)
+
+class PricePanel:
+    """
+    Panneau dense de prix aligné sur le calendrier : un ndarray (n_dates, n_symbols)
+    par champ et une table date -> ligne calculée une seule fois.
+    """
+    def __init__(self, dates, symbols, arrays, mask=None):
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        self.row = {date: i for i, date in enumerate(dates)}
+        self.arrays = arrays
+        self.mask = mask
+
+    def __getitem__(self, field):
+        return self.arrays[field]
+
+    @property
+    def fields(self):
+        return list(self.arrays)
+
 
 class DataHandler:
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, max_resident_symbols: int = MAX_RESIDENT_SYMBOLS, compact: bool = False):
         self.data_path = data_path
+        self.max_resident_symbols = max_resident_symbols
+        self.compact = compact
         self._data_cache = None
+        self._store = None
+        self._calendar = None
+        self._date_rows = None
+        self._columns = {}
+        self._masks = {}
+
+    @classmethod
+    def from_store(cls, store, data_path=None):
+        """
+        DataHandler servi directement par un store déjà ouvert (ex. mémoire partagée).
+        """
+        handler = cls(data_path=data_path)
+        handler._store = store
+        return handler
+
+    def load_store(self):
+        """
+        Retourne le store colonnaire (data/etf.store) s'il existe et n'est pas
+        plus ancien que le pickle, sinon None (lecture du pickle complet).
+        En mode compact, le store data/etf.compact.store est (re)construit au besoin.
+        """
+        if self._store is None:
+            self._store = False
+            path = self.data_path if is_store(self.data_path) else store_path_for(self.data_path, self.compact)
+            pickle_stale = (
+                is_store(path) and os.path.isfile(self.data_path)
+                and os.path.getmtime(self.data_path) > os.path.getmtime(os.path.join(path, MANIFEST))
+            )
+            if self.compact and os.path.isfile(self.data_path) and (pickle_stale or not is_store(path)):
+                convert_pickle(self.data_path, path, compact=True)
+                pickle_stale = False
+            if is_store(path) and not pickle_stale:
+                self._store = open_store(path, self.max_resident_symbols)
+        return self._store or None
+
+    def resident_bytes(self):
+        total = sum(a.nbytes for a in self._columns.values())
+        store = self._store or None
+        if store is not None and store.layout != "columnar":
+            total += store.nbytes
+        if self._data_cache is not None:
+            total += self._data_cache.memory_usage(index=True).sum()
+        return int(total)
+
+    def mapped_bytes(self):
+        store = self._store or None
+        return store.nbytes if store is not None and store.layout == "columnar" else 0
 
     def load_data(self):
         if self._data_cache is None:
@@ -14,7 +162,87 @@ class DataHandler:
             self._data_cache = pd.read_pickle(self.data_path)
         return self._data_cache
 
+    def calendar(self) -> pd.DatetimeIndex:
+        if self._calendar is None:
+            store = self.load_store()
+            self._calendar = store.dates if store is not None else self.load_data().index
+        return self._calendar
+
+    def date_rows(self) -> dict:
+        """
+        Table date -> position entière dans le calendrier, calculée une seule fois.
+        """
+        if self._date_rows is None:
+            self._date_rows = {date: i for i, date in enumerate(self.calendar())}
+        return self._date_rows
+
+    def symbols(self) -> list:
+        store = self.load_store()
+        if store is not None:
+            return store.symbols
+        return list(self.load_data().columns.get_level_values(0).unique())
+
+    def fields(self, symbol: str) -> list:
+        store = self.load_store()
+        if store is not None:
+            return store.fields(symbol)
+        return list(self.load_data()[symbol].columns)
+
+    def column(self, symbol: str, field: str) -> np.ndarray:
+        """
+        Série complète (alignée sur calendar()) d'un champ, adressable par position.
+        En mode compact, la série est en float32 : la comptabilité doit la convertir.
+        """
+        store = self.load_store()
+        if store is not None:
+            return store.column(symbol, field)
+        key = (symbol, field)
+        if key not in self._columns:
+            self._columns[key] = self.load_data()[symbol][field].to_numpy(dtype=np.float64, na_value=np.nan)
+        return self._columns[key]
+
+    def mask(self, symbol: str) -> np.ndarray:
+        """
+        Masque booléen (aligné sur calendar()) des dates où le symbole a réellement coté.
+        """
+        if symbol not in self._masks:
+            store = self.load_store()
+            if store is not None:
+                self._masks[symbol] = store.mask(symbol)
+            else:
+                self._masks[symbol] = self.load_data()[symbol].notna().any(axis=1).to_numpy()
+        return self._masks[symbol]
+
+    def trading_dates(self, start: str = None, end: str = None) -> pd.DatetimeIndex:
+        """
+        Calendrier maître restreint à [start, end].
+        """
+        calendar = self.calendar()
+        lo = 0 if start is None else calendar.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(calendar) if end is None else calendar.searchsorted(pd.Timestamp(end), side="right")
+        return calendar[lo:hi]
+
+    def get_panel(self, symbols: list, fields, start: str = None, end: str = None) -> PricePanel:
+        if isinstance(fields, str):
+            fields = [fields]
+        calendar = self.calendar()
+        lo = 0 if start is None else calendar.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(calendar) if end is None else calendar.searchsorted(pd.Timestamp(end), side="right")
+        arrays = {
+            field: np.column_stack([self.column(s, field)[lo:hi] for s in symbols]).astype(np.float64, copy=False)
+            if len(symbols) else np.empty((hi - lo, 0))
+            for field in fields
+        }
+        mask = (
+            np.column_stack([self.mask(s)[lo:hi] for s in symbols])
+            if len(symbols) else np.empty((hi - lo, 0), dtype=bool)
+        )
+        return PricePanel(calendar[lo:hi], symbols, arrays, mask)
+
     def get(self, symbol: str, price = None, start: str = None, end: str = None) -> pd.DataFrame:
+        store = self.load_store()
+        if store is not None:
+            return self._get_from_store(store, symbol, price, start, end)
         if price == None:
             df = self.load_data()[symbol]
         else:
@@ -23,39 +251,54 @@ class DataHandler:
             df = df.loc[start:end]
         return df
 
+    def _get_from_store(self, store, symbol, price, start, end):
+        lo, hi = store.rows(start, end)
+        index = store.dates[lo:hi]
+        if isinstance(symbol, str):
+            if price is None or isinstance(price, list):
+                fields = store.fields(symbol) if price is None else price
+                return pd.DataFrame(
+                    {field: np.array(store.column(symbol, field)[lo:hi], dtype=np.float64) for field in fields},
+                    index=index
+                ).rename_axis(columns="Price")
+            return pd.Series(np.array(store.column(symbol, price)[lo:hi], dtype=np.float64), index=index, name=price)
+        columns = {
+            (s, field): np.array(store.column(s, field)[lo:hi], dtype=np.float64)
+            for s in symbol for field in store.fields(s)
+        }
+        df = pd.DataFrame(columns, index=index)
+        df.columns = pd.MultiIndex.from_tuples(columns.keys(), names=["Ticker", "Price"])
+        return df
+
     def get_multiple(self, symbols: list, price = ['Open', 'High', 'Low', 'Close', 'Volume'], start: str = None, end: str = None) -> dict:
         return {s: self.get(s, price, start, end) for s in symbols}
     
     def get_multiple_df(self, symbols: list, price, start: str = None, end: str = None) -> pd.DataFrame:
+        store = self.load_store()
+        if store is not None:
+            lo, hi = store.rows(start, end)
+            adj_close_df = pd.DataFrame(
+                {s: np.array(store.column(s, price)[lo:hi], dtype=np.float64) for s in symbols},
+                index=store.dates[lo:hi]
+            )
+            adj_close_df.columns.name = "Ticker"
+            return adj_close_df
         data = self.load_data()
         adj_close_df = data.loc[start:end, pd.IndexSlice[symbols, price]]
         adj_close_df.columns = adj_close_df.columns.droplevel(1)
         
         return adj_close_df
     
-    def download_from_yf(self):
-        etf_tickers = [
-        # ▶️ Indices US
-        "SPY", "VOO", "VTI", "IVV", "QQQ", "DIA", "IWM",
-        # ▶️ Marchés internationaux
-        "VEA", "IEFA", "ACWI", "VT", "VXUS",
-        # ▶️ Pays émergents
-        "EEM", "VWO", "IEMG", "EMXC",
-        # ▶️ Obligations
-        "BND", "AGG", "TLT", "LQD", "HYG", "IEF", "SHY", "SGOV", "BIL", "SHV",
-        # ▶️ Secteurs US
-        "XLK", "XLF", "XLV", "XLY", "XLE", "XLI", "XLB", "XLU", "XLRE", "XLC",
-        # ▶️ Matières premières
-        "GLD", "SLV", "DBC", "USO", "DBA", "PPLT", "CPER",
-        # ▶️ Immobilier
-        "VNQ", "IYR", "SCHH", "REET",
-        # ▶️ Stratégies / Facteurs
-        "SPLV", "USMV", "MTUM", "QUAL", "VIG", "DVY", "RSP", "SPHD",
-        # ▶️ Devise / hedging
-        "UUP", "FXE", "FXF"
-        ]
-        df = yf.download(etf_tickers, period="max", auto_adjust=False, group_by='ticker')
-        df.columns.names = ['Ticker', 'Price']
-        df.to_pickle('etf.pkl')
-        return df
-
+    def download_from_yf(self, fetcher=None, max_workers=8):
+        """
+        Met à jour le pickle du handler (data/etf.pkl par défaut) avec les tickers
+        qu'il contient déjà ; un fichier absent est créé avec ETF_TICKERS.
+        Le handler n'est pas modifié : get_data_handler en recharge un nouveau au
+        prochain appel (le mtime du fichier a changé).
+        Retourne (données mises à jour, {ticker: exception} des échecs).
+        """
+        data_path = self.data_path or "data/etf.pkl"
+        updater = MarketDataUpdater(data_path, fetcher=fetcher, max_workers=max_workers)
+        report = updater.update(None if os.path.exists(data_path) else ETF_TICKERS)
+        failed = {t: e for t, e in report.items() if isinstance(e, Exception)}
+        return updater.data, failed
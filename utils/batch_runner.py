@@ -0,0 +1,152 @@
+import argparse
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import yaml
+
+# Pas d'affichage graphique : serveurs sans X
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+BATCH_DIR = "output/batch"
+
+
+def _buy_and_hold(job):
+    from strategies.buy_and_hold import BuyAndHold
+    return BuyAndHold(job["preset"], save_outputs=False), {}
+
+
+def _pairs(job):
+    from strategies.pairs_trading import PairsTradingStrategy
+    return PairsTradingStrategy(tuple(job["pair"]), save_outputs=False, **job.get("params", {})), {}
+
+
+def _markowitz(job):
+    from strategies.markowitz import Markowitz
+    # Un job = un processus : pas de pool imbriqué pour l'optimisation des dates
+    return Markowitz(list(job["assets"]), save_outputs=False, **job.get("params", {})), {"max_workers": 1}
+
+
+# Nom -> constructeur (stratégie, arguments de run_backtest)
+BATCH_STRATEGIES = {
+    "buy_and_hold": _buy_and_hold,
+    "pairs": _pairs,
+    "markowitz": _markowitz,
+}
+
+
+def load_jobs(path) -> list:
+    """
+    Fichier YAML de jobs :
+        jobs:
+          - {strategy: buy_and_hold, preset: balanced}
+          - {strategy: pairs, pair: [AVB, CPT], params: {window: 126, z_enter: 2}}
+          - {name: core_etf, strategy: markowitz, assets: [SPY, QQQ, GLD], params: {diversification: 0.5}}
+    Chaque job reçoit un nom unique (name, sinon numéro et stratégie).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        jobs = (yaml.safe_load(f) or {}).get("jobs") or []
+    names = set()
+    for i, job in enumerate(jobs):
+        if job.get("strategy") not in BATCH_STRATEGIES:
+            raise ValueError(f"Job {i} : stratégie inconnue {job.get('strategy')!r} ({', '.join(BATCH_STRATEGIES)})")
+        name = re.sub(r"[^\w.-]+", "_", str(job.get("name") or f"{i:03d}_{job['strategy']}"))
+        if name in names:
+            raise ValueError(f"Nom de job en double : {name}")
+        names.add(name)
+        job["name"] = name
+    return jobs
+
+
+def _clean(value):
+    # Valeurs JSON strictes : numpy -> Python, NaN/inf -> null
+    if isinstance(value, dict):
+        return {str(k): _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+
+def run_job(job) -> dict:
+    """
+    Exécute un job sans rendu console ni graphique et retourne son résultat :
+    statut, durée et statistiques de run_backtest (portefeuille et benchmark).
+    """
+    result = {"name": job["name"], "job": job}
+    started = time.perf_counter()
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+            strategy, run_kwargs = BATCH_STRATEGIES[job["strategy"]](job)
+            strategy.headless = True
+            all_stats = strategy.run_backtest(plot=False, **run_kwargs)
+        result.update(status="ok", stats=all_stats.to_dict())
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    result["elapsed"] = time.perf_counter() - started
+    return _clean(result)
+
+
+def write_result(result, out_dir=BATCH_DIR) -> str:
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{result['name']}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+def run_batch(jobs, max_workers=None, out_dir=BATCH_DIR, progress=None) -> list:
+    """
+    Lance les jobs dans un pool d'au plus max_workers processus ; chaque résultat
+    est écrit dans out_dir/<name>.json dès que le job se termine.
+    Retourne la liste des résultats dans l'ordre des jobs.
+    """
+    n_workers = min(max_workers or os.cpu_count() or 1, len(jobs)) if jobs else 1
+    results = {}
+    if n_workers <= 1:
+        completed = ((job["name"], run_job(job)) for job in jobs)
+        for n, (name, result) in enumerate(completed, start=1):
+            write_result(result, out_dir)
+            results[name] = result
+            if progress:
+                progress(n, len(jobs), result)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(run_job, job): job["name"] for job in jobs}
+            for n, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                write_result(result, out_dir)
+                results[futures[future]] = result
+                if progress:
+                    progress(n, len(jobs), result)
+    return [results[job["name"]] for job in jobs]
+
+
+if __name__ == "__main__":
+    # python -m utils.batch_runner config/jobs.yaml --workers 4 --out output/batch
+    parser = argparse.ArgumentParser(description="Backtests en lot, sans interface")
+    parser.add_argument("jobs", help="fichier YAML de jobs")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out", default=BATCH_DIR)
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs)
+    results = run_batch(
+        jobs, max_workers=args.workers, out_dir=args.out,
+        progress=lambda n, total, result: print(
+            f"[{n}/{total}] {result['name']} : {result['status']} ({result['elapsed']:.1f}s)"
+            + (f" - {result['error']}" if result["status"] == "error" else "")
+        ),
+    )
+    failed = [result["name"] for result in results if result["status"] != "ok"]
+    print(f"{len(results) - len(failed)}/{len(results)} jobs réussis, résultats dans {args.out}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,68 @@
+import argparse
+import time
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from sklearn.covariance import LedoitWolf
+
+
+def naive_markowitz_optimize(gamma, mean_returns, cov_matrix, diversification):
+    """
+    Version d'origine : problème cvxpy reconstruit et recanonicalisé à chaque appel.
+    """
+    n = len(mean_returns)
+    w = cp.Variable(n)
+    global_mean = mean_returns.mean()
+    shrunk_returns = 0.5 * mean_returns + 0.5 * global_mean
+    objective = cp.Minimize(cp.quad_form(w, cov_matrix) - gamma * (w @ shrunk_returns))
+    constraints = [cp.sum(w) == 1, w >= 0, n * cp.sum_squares(w) <= 1/diversification]
+    cp.Problem(objective, constraints).solve()
+    return w.value
+
+
+def rebalance_windows(strategy, n_rebalances):
+    pre_start = strategy.start - pd.Timedelta(days=strategy.lookback_window*2)
+    prices = strategy.data_handler.get_multiple_df(list(strategy.assets), price='Adj Close', start=pre_start)
+    for date in strategy.dates[::strategy.allocation_window][:n_rebalances]:
+        data = prices.loc[prices.index[prices.index <= date][-strategy.lookback_window:]]
+        returns = data.pct_change().dropna()
+        yield date, returns.mean().values * 252, LedoitWolf().fit(returns.values).covariance_ * 252
+
+
+def run(assets, n_rebalances=5):
+    """
+    Temps par rebalancement (100 gammas) : problème reconstruit à chaque solve
+    contre problème DPP compilé une fois avec warm start.
+    """
+    from strategies.markowitz import Markowitz
+    strategy = Markowitz(list(assets))
+    gammas = np.linspace(0, 1, 100)
+    rows = []
+    for date, mean_returns, cov_matrix in rebalance_windows(strategy, n_rebalances):
+        t = time.perf_counter()
+        naive = [naive_markowitz_optimize(g, mean_returns, cov_matrix, strategy.diversification) for g in gammas]
+        naive_time = time.perf_counter() - t
+        t = time.perf_counter()
+        qp = strategy.markowitz_problem(len(mean_returns))
+        qp.set_moments(mean_returns, cov_matrix)
+        compiled = [qp.solve(g) for g in gammas]
+        compiled_time = time.perf_counter() - t
+        rows.append({
+            "date": date,
+            "naive (s)": naive_time,
+            "compiled (s)": compiled_time,
+            "speedup": naive_time / compiled_time,
+            "max |Δw|": float(np.max(np.abs(np.array(naive) - np.array(compiled)))),
+        })
+    return pd.DataFrame(rows).set_index("date")
+
+
+if __name__ == "__main__":
+    # python -m utils.bench_markowitz SPY QQQ VEA EEM BIL GLD --rebalances 5
+    parser = argparse.ArgumentParser(description="Benchmark de l'optimisation Markowitz par rebalancement")
+    parser.add_argument("assets", nargs="+")
+    parser.add_argument("--rebalances", type=int, default=5)
+    args = parser.parse_args()
+    report = run(args.assets, args.rebalances)
+    print(report.to_string())
+    print(f"Accélération moyenne : x{report['speedup'].mean():.1f}")
@@ -0,0 +1,64 @@
+import hashlib
+import json
+import os
+import threading
+import pandas as pd
+from utils.backtest_utils import data_fingerprint
+
+BENCHMARK_CACHE_DIR = "output/.benchmark_cache"
+
+_MEMORY = {}
+_LOCK = threading.Lock()
+
+
+def benchmark_key(strategy, preset) -> str:
+    """
+    Hash des entrées du benchmark : dates, capital, frais, preset et empreinte
+    des données. Un fichier de données modifié change la clé.
+    """
+    handler = strategy.data_handler
+    config = strategy.general_config
+    payload = {
+        "preset": preset,
+        "assets": strategy.config["portfolio_presets"].get(preset, {preset: 1}),
+        "reallocation": [strategy.reallocation_window, strategy.reallocation_amount],
+        "dates": hashlib.sha256(strategy.dates.asi8.tobytes()).hexdigest(),
+        "capital": strategy.capital,
+        "fees": [config["fee_rate"], config["slippage"], config.get("cost_models")],
+        "data": data_fingerprint(handler.data_path, handler.compact),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def cached_benchmark(preset='SPY', data_handler=None, cache_dir=BENCHMARK_CACHE_DIR):
+    """
+    BuyAndHold.run_benchmark(preset) mémoïsé en mémoire et sur disque.
+    Retourne (portfolio_df, stats_df).
+    """
+    from strategies.buy_and_hold import BuyAndHold
+    strategy = BuyAndHold(preset=preset, data_handler=data_handler, save_outputs=False)
+    key = benchmark_key(strategy, preset)
+    path = os.path.join(cache_dir, f"{key}.pkl")
+    with _LOCK:
+        result = _MEMORY.get(key)
+    if result is None and os.path.isfile(path):
+        result = pd.read_pickle(path)
+    if result is None:
+        result = strategy.run_benchmark(preset=preset)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        pd.to_pickle(result, tmp_path)
+        os.replace(tmp_path, path)
+    with _LOCK:
+        _MEMORY[key] = result
+    portfolio_df, stats_df = result
+    return portfolio_df.copy(), stats_df.copy()
+
+
+def clear_benchmark_cache(cache_dir=BENCHMARK_CACHE_DIR):
+    with _LOCK:
+        _MEMORY.clear()
+    if os.path.isdir(cache_dir):
+        for name in os.listdir(cache_dir):
+            if name.endswith(".pkl"):
+                os.remove(os.path.join(cache_dir, name))
@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Mêmes noms et unités que PerformanceAnalyzer.raw_statistics
+METRICS = ("Annualized Return (%)", "Annualized Volatility (%)", "Sharpe Ratio", "Max Drawdown (%)")
+METHODS = ("block", "stationary")
+
+
+def bootstrap_indices(rng, n_paths, n, block_size=20, method="stationary"):
+    """
+    Indices (n_paths, n) de rééchantillonnage d'une série de n rendements :
+    - "block" : blocs consécutifs de longueur fixe block_size (moving block bootstrap) ;
+    - "stationary" : blocs de longueur géométrique de moyenne block_size, la série
+      étant lue de façon circulaire (Politis & Romano).
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue : {method} ({', '.join(METHODS)})")
+    block_size = max(1, min(block_size, n))
+    if method == "block":
+        n_blocks = -(-n // block_size)
+        starts = rng.integers(0, n - block_size + 1, size=(n_paths, n_blocks))
+        return (starts[:, :, None] + np.arange(block_size)).reshape(n_paths, -1)[:, :n]
+    positions = np.arange(n)
+    new_block = rng.random((n_paths, n)) < 1.0 / block_size
+    new_block[:, 0] = True
+    # Position du début du bloc courant, puis décalage depuis ce début
+    block_start = np.maximum.accumulate(np.where(new_block, positions, 0), axis=1)
+    starts = rng.integers(0, n, size=(n_paths, n))
+    return (np.take_along_axis(starts, block_start, axis=1) + positions - block_start) % n
+
+
+def path_metrics(paths, n_obs=None, risk_free_rate=0, periods=252):
+    """
+    Métriques de chaque ligne d'une matrice (n_paths, n) de rendements, calculées
+    comme raw_statistics : n_obs est le nombre de lignes du portefeuille (n + 1 par
+    défaut, la première valeur n'ayant pas de rendement).
+    Retourne un tableau (n_paths, len(METRICS)).
+    """
+    n_obs = paths.shape[1] + 1 if n_obs is None else n_obs
+    growth = np.cumprod(1.0 + paths, axis=1)
+    annualized_return = growth[:, -1] ** (periods / n_obs) - 1
+    annualized_volatility = paths.std(axis=1, ddof=1) * np.sqrt(periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(
+            annualized_volatility > 0, (annualized_return - risk_free_rate) / annualized_volatility, np.nan
+        )
+    # Le pic initial (valeur de départ = 1) compte dans le drawdown
+    peak = np.maximum(np.maximum.accumulate(growth, axis=1), 1.0)
+    max_drawdown = np.minimum((growth / peak - 1).min(axis=1), 0.0)
+    return np.column_stack([
+        annualized_return * 100, annualized_volatility * 100, sharpe, max_drawdown * 100
+    ])
+
+
+def _metrics_chunk(job):
+    returns, seed, n_paths, block_size, method, n_obs, risk_free_rate = job
+    rng = np.random.default_rng(seed)
+    idx = bootstrap_indices(rng, n_paths, len(returns), block_size, method)
+    return path_metrics(returns[idx], n_obs, risk_free_rate)
+
+
+def bootstrap_metrics(returns, n_paths=10000, block_size=20, method="stationary", seed=None, chunk_size=2000,
+                      n_obs=None, risk_free_rate=0, max_workers=1) -> pd.DataFrame:
+    """
+    Métriques de n_paths trajectoires rééchantillonnées par blocs. Les trajectoires
+    sont générées par lots de chunk_size (mémoire bornée à chunk_size x len(returns)),
+    chaque lot ayant sa propre graine dérivée de seed : le résultat ne dépend pas du
+    nombre de workers. max_workers > 1 répartit les lots sur un pool de processus.
+    Retourne un DataFrame (n_paths, METRICS).
+    """
+    returns = np.asarray(pd.Series(returns).dropna(), dtype=np.float64)
+    if len(returns) < 2:
+        raise ValueError("Au moins deux rendements sont nécessaires")
+    sizes = [min(chunk_size, n_paths - lo) for lo in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(returns, s, size, block_size, method, n_obs, risk_free_rate) for s, size in zip(seeds, sizes)]
+    n_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if n_workers <= 1:
+        parts = [_metrics_chunk(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(_metrics_chunk, jobs))
+    return pd.DataFrame(np.vstack(parts), columns=list(METRICS))
+
+
+def confidence_intervals(samples: pd.DataFrame, level=0.95) -> pd.DataFrame:
+    """
+    Intervalles par percentiles des distributions bootstrap (une ligne par métrique).
+    """
+    alpha = (1 - level) / 2
+    return pd.DataFrame({
+        "Moyenne": samples.mean(),
+        f"{alpha * 100:g}%": samples.quantile(alpha),
+        f"{(1 - alpha) * 100:g}%": samples.quantile(1 - alpha),
+    })
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from core.compute_performance import PerformanceAnalyzer
+from utils.backtest_utils import DataHandler
+
+
+def run_buy_and_hold(data_handler, preset="balanced"):
+    from strategies.buy_and_hold import BuyAndHold
+    portfolio_df, _ = BuyAndHold(preset, data_handler=data_handler).run_benchmark(preset)
+    return portfolio_df
+
+
+def run_pairs_trading(data_handler, pair=("AVB", "CPT")):
+    from strategies.pairs_trading import PairsTradingStrategy
+    return PairsTradingStrategy(tuple(pair), data_handler=data_handler).simulate()[0]
+
+
+def run_markowitz(data_handler, assets=("SPY", "QQQ", "GLD")):
+    from strategies.markowitz import Markowitz
+    return Markowitz(list(assets), data_handler=data_handler).simulate()[0]
+
+
+def compact_error_report(data_path, runner=run_buy_and_hold) -> pd.DataFrame:
+    """
+    Écart introduit par le mode compact (float32 / uint32) par rapport au float64,
+    sur les métriques de PerformanceAnalyzer.compute_statistics (non arrondies)
+    et sur la courbe de valeur. runner(data_handler) -> portfolio_df.
+    """
+    results = {}
+    curves = {}
+    for label, compact in (("float64", False), ("compact", True)):
+        handler = DataHandler(data_path=data_path, compact=compact)
+        portfolio_df = runner(handler)
+        analyzer = PerformanceAnalyzer(handler, portfolio_df, {}, strategy=None)
+        results[label] = analyzer.raw_statistics()
+        curves[label] = portfolio_df["value"]
+
+    report = pd.DataFrame(results)
+    report["abs_error"] = (report["compact"] - report["float64"]).abs()
+    report["rel_error"] = report["abs_error"] / report["float64"].abs().replace(0, np.nan)
+    value_error = (curves["compact"] - curves["float64"]).abs()
+    report.loc["Max Value Error", ["float64", "compact", "abs_error", "rel_error"]] = [
+        0.0, value_error.max(), value_error.max(), (value_error / curves["float64"].abs()).max()
+    ]
+    report.index.name = "Statistique"
+    return report
@@ -0,0 +1,139 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from utils.price_store import is_store, open_store, store_path_for, write_store
+
+PRICE_FIELDS = ['Adj Close', 'Close', 'High', 'Low', 'Open', 'Volume']
+
+
+class YahooFetcher:
+    """
+    Source yfinance : historique d'un ticker à partir de start (tout l'historique si None).
+    """
+    def fetch(self, ticker, start=None) -> pd.DataFrame:
+        import yfinance as yf
+        if start is None:
+            df = yf.download(ticker, period="max", auto_adjust=False, progress=False, group_by="column")
+        else:
+            df = yf.download(ticker, start=start, auto_adjust=False, progress=False, group_by="column")
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        return df
+
+
+class PickleFetcher:
+    """
+    Source locale (pickle au format (Ticker, Price)), pour les mises à jour hors ligne.
+    """
+    def __init__(self, path):
+        self.data = pd.read_pickle(path) if isinstance(path, str) else path
+
+    def fetch(self, ticker, start=None) -> pd.DataFrame:
+        if ticker not in self.data.columns.get_level_values(0):
+            return pd.DataFrame(columns=PRICE_FIELDS)
+        df = self.data[ticker].dropna(how='all')
+        return df.loc[start:] if start is not None else df
+
+
+class MarketDataUpdater:
+    """
+    Mise à jour incrémentale d'un pickle de prix : pour chaque ticker, seule la fin
+    manquante après la dernière date stockée est téléchargée, en parallèle (pool
+    borné), avec retries et backoff exponentiel par ticker. Le pickle (et son store
+    s'il existe) est réécrit de façon atomique.
+    """
+    def __init__(self, data_path, fetcher=None, max_workers=8, retries=3, backoff=1.0, sleep=time.sleep):
+        self.data_path = data_path
+        self.fetcher = fetcher or YahooFetcher()
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def load(self) -> pd.DataFrame:
+        if os.path.exists(self.data_path):
+            return pd.read_pickle(self.data_path)
+        return None
+
+    def last_dates(self, df) -> dict:
+        if df is None:
+            return {}
+        last = {}
+        for ticker in df.columns.get_level_values(0).unique():
+            valid = df[ticker].dropna(how='all').index
+            last[ticker] = valid.max() if len(valid) else None
+        return last
+
+    def fetch_tail(self, ticker, last_date):
+        start = None if last_date is None else (last_date + pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+        for attempt in range(self.retries + 1):
+            try:
+                df = self.fetcher.fetch(ticker, start=start)
+                break
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                self.sleep(self.backoff * 2 ** attempt)
+        if df is None or df.empty:
+            return None
+        df = df.copy()
+        df.index = pd.DatetimeIndex(df.index).tz_localize(None)
+        if last_date is not None:
+            df = df[df.index > last_date]
+        return df if not df.empty else None
+
+    def update(self, tickers=None) -> dict:
+        """
+        Met à jour tickers (par défaut, ceux déjà présents dans le pickle).
+        Retourne un rapport {ticker: nombre de nouvelles lignes ou exception}.
+        """
+        current = self.load()
+        last = self.last_dates(current)
+        if tickers is None:
+            tickers = list(last)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {t: pool.submit(self.fetch_tail, t, last.get(t)) for t in tickers}
+        report = {}
+        tails = {}
+        for ticker, future in futures.items():
+            try:
+                tail = future.result()
+            except Exception as e:
+                report[ticker] = e
+                continue
+            report[ticker] = 0 if tail is None else len(tail)
+            if tail is not None:
+                tails[ticker] = tail
+        if tails:
+            self.data = self.merge(current, tails)
+            self.write(self.data)
+        else:
+            self.data = current
+        return report
+
+    def merge(self, current, tails) -> pd.DataFrame:
+        frames = {}
+        stored = [] if current is None else list(current.columns.get_level_values(0).unique())
+        for ticker in stored + [t for t in tails if t not in stored]:
+            old = current[ticker].dropna(how='all') if ticker in stored else None
+            new = tails.get(ticker)
+            if old is None:
+                frames[ticker] = new
+            elif new is None:
+                frames[ticker] = old
+            else:
+                frames[ticker] = pd.concat([old, new[[c for c in old.columns if c in new.columns]]])
+        df = pd.concat(frames, axis=1).sort_index()
+        df.index.name = "Date"
+        df.columns.names = ['Ticker', 'Price']
+        return df
+
+    def write(self, df):
+        tmp_path = self.data_path + ".tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, self.data_path)
+        store_path = store_path_for(self.data_path)
+        if is_store(store_path):
+            store = open_store(store_path)
+            write_store(df, store_path, layout=store.layout, compact=store.compact, **store.calendar_options)
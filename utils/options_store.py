@@ -0,0 +1,114 @@
+import json
+import operator
+import os
+import shutil
+import sys
+import numpy as np
+import pandas as pd
+
+OPTIONS_STORE_ROOT = "market_data/options_store"
+
+# Filtres de liquidité appliqués par get_options_data
+OPTIONS_FILTERS = [
+    ("iv", "<", 1.5),
+    ("volume", ">", 0),
+    ("open_interest", ">", 10),
+]
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class OptionsChainStore:
+    """
+    Chaînes d'options partitionnées par ticker puis par date de cotation.
+    Chaque ticker est stocké en colonnes .npy triées par (date, expiration, strike),
+    avec un index date -> [début, fin) : charger une journée ne lit que ses lignes,
+    et les filtres sont évalués avant de matérialiser les autres colonnes.
+    """
+    def __init__(self, root=OPTIONS_STORE_ROOT):
+        self.root = root
+        self._indexes = {}
+
+    def ticker_path(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def has(self, ticker):
+        return os.path.isfile(os.path.join(self.ticker_path(ticker), "index.json"))
+
+    def index(self, ticker):
+        if ticker not in self._indexes:
+            with open(os.path.join(self.ticker_path(ticker), "index.json"), "r", encoding="utf-8") as f:
+                self._indexes[ticker] = json.load(f)
+        return self._indexes[ticker]
+
+    def dates(self, ticker):
+        return list(self.index(ticker)["dates"])
+
+    def _column(self, ticker, name):
+        return np.load(os.path.join(self.ticker_path(ticker), f"{name}.npy"), mmap_mode="r")
+
+    def load(self, ticker, date, filters=None, columns=None) -> pd.DataFrame:
+        index = self.index(ticker)
+        columns = columns or index["columns"]
+        bounds = index["dates"].get(str(date))
+        if bounds is None:
+            return pd.DataFrame({c: pd.Series(dtype=index["dtypes"][c]) for c in columns})
+        start, end = bounds
+        keep = np.ones(end - start, dtype=bool)
+        for name, op, value in filters or []:
+            keep &= OPERATORS[op](self._column(ticker, name)[start:end], value)
+        rows = np.flatnonzero(keep) + start
+        return pd.DataFrame({c: np.asarray(self._column(ticker, c)[rows]) for c in columns})
+
+    def build(self, ticker, csv_path=None):
+        """
+        Conversion unique de market_data/{ticker}.csv vers le store.
+        """
+        csv_path = csv_path or f"market_data/{ticker}.csv"
+        df = pd.read_csv(csv_path)
+        df = df.assign(
+            _date=pd.to_datetime(df["date"]),
+            _expiration=pd.to_datetime(df["expiration"]),
+        ).sort_values(["_date", "_expiration", "strike"], kind="mergesort")
+        df = df.drop(columns=["_date", "_expiration"]).reset_index(drop=True)
+
+        out_path = self.ticker_path(ticker)
+        tmp_path = out_path + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        dtypes = {}
+        for column in df.columns:
+            values = df[column].to_numpy()
+            if values.dtype == object:
+                values = values.astype(str)
+            np.save(os.path.join(tmp_path, f"{column}.npy"), values)
+            dtypes[column] = str(values.dtype)
+
+        dates = df["date"].astype(str).to_numpy()
+        starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]])
+        ends = np.r_[starts[1:], len(dates)]
+        index = {
+            "columns": list(df.columns),
+            "dtypes": dtypes,
+            "dates": {dates[s]: [int(s), int(e)] for s, e in zip(starts, ends)},
+        }
+        with open(os.path.join(tmp_path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        shutil.rmtree(out_path, ignore_errors=True)
+        os.replace(tmp_path, out_path)
+        self._indexes.pop(ticker, None)
+        return out_path
+
+
+if __name__ == "__main__":
+    # python -m utils.options_store NVDA AAPL
+    store = OptionsChainStore()
+    for ticker in sys.argv[1:]:
+        print(f"{ticker} -> {store.build(ticker)}")
@@ -0,0 +1,199 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from utils.backtest_utils import get_data_handler
+from utils.options_utils import load_yaml, save_yaml
+
+SCAN_DIR = "output/Pairs Trading Strategy/scan"
+RESULT_COLUMNS = ["s1", "s2", "corr", "beta", "eg_stat", "p_value", "half_life"]
+
+_WORKER = {}
+
+
+def log_price_matrix(data_handler, start=None, end=None, field="Close", min_coverage=0.95):
+    """
+    Matrice (n_dates, n_symbols) des log-prix sur [start, end], trous comblés par la
+    dernière valeur ; les symboles cotés moins de min_coverage du temps sont écartés.
+    """
+    symbols = [s for s in data_handler.symbols() if field in data_handler.fields(s)]
+    panel = data_handler.get_panel(symbols, field, start=start, end=end)
+    prices = np.where(panel.mask, panel[field], np.nan)
+    keep = (np.isfinite(prices) & (prices > 0)).mean(axis=0) >= min_coverage
+    prices = pd.DataFrame(prices[:, keep]).ffill().bfill().to_numpy()
+    return panel.dates, [s for s, k in zip(symbols, keep) if k], np.log(prices)
+
+
+def correlation_prefilter(log_prices, min_corr=0.9, max_pairs=None):
+    """
+    Corrélation de tous les couples de colonnes en une opération matricielle ;
+    retourne les indices (i, j), i < j, des couples au-dessus du seuil, du plus corrélé
+    au moins corrélé.
+    """
+    corr = np.corrcoef(log_prices, rowvar=False)
+    i, j = np.triu_indices(corr.shape[0], k=1)
+    values = corr[i, j]
+    keep = values >= min_corr
+    i, j, values = i[keep], j[keep], values[keep]
+    order = np.argsort(-values, kind="stable")
+    if max_pairs is not None:
+        order = order[:max_pairs]
+    return i[order], j[order], values[order]
+
+
+def half_life(spread):
+    """
+    Demi-vie de retour à la moyenne : régression de Δspread sur spread(t-1).
+    """
+    lag = spread[:-1] - spread[:-1].mean()
+    delta = np.diff(spread)
+    b = np.dot(lag, delta - delta.mean()) / np.dot(lag, lag)
+    return -np.log(2) / b if b < 0 else np.inf
+
+
+def engle_granger(x, y):
+    """
+    Test d'Engle-Granger de y sur x : (beta, statistique ADF, p-value, demi-vie).
+    """
+    from statsmodels.tsa.stattools import coint
+    X = np.column_stack([np.ones_like(x), x])
+    alpha, beta = np.linalg.lstsq(X, y, rcond=None)[0]
+    stat, p_value, _ = coint(y, x)
+    return beta, stat, p_value, half_life(y - alpha - beta * x)
+
+
+def _init_worker(name, shape):
+    shm = shared_memory.SharedMemory(name=name)
+    _WORKER["shm"] = shm
+    _WORKER["prices"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def _test_chunk(chunk):
+    prices = _WORKER["prices"]
+    rows = []
+    for i, j, corr in chunk:
+        beta, stat, p_value, hl = engle_granger(prices[:, i], prices[:, j])
+        rows.append((int(i), int(j), corr, beta, stat, p_value, hl))
+    return rows
+
+
+class PairScanner:
+    """
+    Recherche de paires cointégrées sur tout un univers :
+    1. préfiltre vectorisé par corrélation des log-prix,
+    2. tests d'Engle-Granger (ADF sur le résidu) des survivants dans un pool de processus,
+    3. classement par statistique de test puis demi-vie.
+    L'avancement est enregistré par lots dans scan_dir ; une relance avec les mêmes
+    paramètres reprend là où le scan s'est arrêté.
+    Les paires retournées sont (s1, s2) avec s2 régressé sur s1, comme compute_spread.
+    """
+    def __init__(self, data_path="data/s&p500.pkl", start=None, end=None, min_corr=0.9, max_pairs=None,
+                 max_p_value=0.05, min_half_life=1, max_half_life=126, scan_dir=SCAN_DIR):
+        general_config = load_yaml("config/general.yaml")
+        backtest_start = pd.Timestamp(general_config["start_date"])
+        # Période de formation par défaut : les deux années précédant le backtest
+        self.start = pd.Timestamp(start) if start is not None else backtest_start - pd.Timedelta(days=2 * 365)
+        self.end = pd.Timestamp(end) if end is not None else backtest_start - pd.Timedelta(days=1)
+        self.data_path = data_path
+        self.min_corr = min_corr
+        self.max_pairs = max_pairs
+        self.max_p_value = max_p_value
+        self.min_half_life = min_half_life
+        self.max_half_life = max_half_life
+        self.scan_dir = scan_dir
+
+    def _scan_id(self, symbols):
+        payload = {
+            "data": os.path.abspath(self.data_path), "start": str(self.start), "end": str(self.end),
+            "min_corr": self.min_corr, "max_pairs": self.max_pairs, "symbols": symbols,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _load_checkpoint(self, path, scan_id):
+        meta_path = os.path.join(self.scan_dir, "checkpoint.json")
+        if os.path.isfile(path) and os.path.isfile(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                if json.load(f).get("scan_id") == scan_id:
+                    return pd.read_csv(path)
+        os.makedirs(self.scan_dir, exist_ok=True)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"scan_id": scan_id}, f)
+        pd.DataFrame(columns=RESULT_COLUMNS).to_csv(path, index=False)
+        return None
+
+    def scan(self, max_workers=None, chunk_size=500, progress=None) -> pd.DataFrame:
+        handler = get_data_handler(self.data_path)
+        _, symbols, log_prices = log_price_matrix(handler, self.start, self.end)
+        i, j, corr = correlation_prefilter(log_prices, self.min_corr, self.max_pairs)
+
+        path = os.path.join(self.scan_dir, "checkpoint.csv")
+        done = self._load_checkpoint(path, self._scan_id(symbols))
+        tested = set() if done is None else set(zip(done["s1"], done["s2"]))
+        todo = [(a, b, c) for a, b, c in zip(i, j, corr) if (symbols[a], symbols[b]) not in tested]
+        chunks = [todo[k:k + chunk_size] for k in range(0, len(todo), chunk_size)]
+
+        if chunks:
+            shm = shared_memory.SharedMemory(create=True, size=log_prices.nbytes)
+            try:
+                np.ndarray(log_prices.shape, dtype=np.float64, buffer=shm.buf)[:] = log_prices
+                with ProcessPoolExecutor(
+                    max_workers=max_workers, initializer=_init_worker, initargs=(shm.name, log_prices.shape)
+                ) as pool:
+                    for n, rows in enumerate(pool.map(_test_chunk, chunks), start=1):
+                        batch = pd.DataFrame(rows, columns=["i", "j"] + RESULT_COLUMNS[2:])
+                        batch.insert(0, "s1", [symbols[a] for a in batch.pop("i")])
+                        batch.insert(1, "s2", [symbols[b] for b in batch.pop("j")])
+                        batch.to_csv(path, mode="a", header=False, index=False)
+                        if progress:
+                            progress(n, len(chunks))
+            finally:
+                shm.close()
+                shm.unlink()
+        return self.rank(pd.read_csv(path))
+
+    def rank(self, results: pd.DataFrame) -> pd.DataFrame:
+        selected = results[
+            (results["p_value"] <= self.max_p_value)
+            & results["half_life"].between(self.min_half_life, self.max_half_life)
+        ]
+        return selected.sort_values(["eg_stat", "half_life"]).reset_index(drop=True)
+
+
+def best_pairs(ranked: pd.DataFrame, n=10) -> list:
+    """
+    Les n meilleures paires, directement utilisables par PairsTradingStrategy(pair)
+    ou utils.pairs_sweep.run_sweep.
+    """
+    return list(zip(ranked["s1"].head(n), ranked["s2"].head(n)))
+
+
+if __name__ == "__main__":
+    # python -m utils.pair_scanner --min-corr 0.9 --top 20 --use-best
+    parser = argparse.ArgumentParser(description="Recherche de paires cointégrées")
+    parser.add_argument("--data", default="data/s&p500.pkl")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--min-corr", type=float, default=0.9)
+    parser.add_argument("--max-pairs", type=int)
+    parser.add_argument("--max-p-value", type=float, default=0.05)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--use-best", action="store_true", help="écrit la meilleure paire dans config/pairs_trading.yaml")
+    args = parser.parse_args()
+
+    scanner = PairScanner(
+        args.data, start=args.start, end=args.end, min_corr=args.min_corr,
+        max_pairs=args.max_pairs, max_p_value=args.max_p_value
+    )
+    ranked = scanner.scan(max_workers=args.workers, progress=lambda n, total: print(f"lot {n}/{total}"))
+    ranked.to_csv(os.path.join(scanner.scan_dir, "ranked_pairs.csv"), index=False)
+    print(ranked.head(args.top).to_string(index=False))
+    if args.use_best and len(ranked):
+        config = load_yaml("config/pairs_trading.yaml")
+        config["pair"] = ",".join(best_pairs(ranked, 1)[0])
+        save_yaml(config, "config/pairs_trading.yaml")
+        print(f"Paire enregistrée : {config['pair']}")
@@ -0,0 +1,120 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.backtest_utils import DataHandler, get_data_handler
+from utils.shared_store import SharedPriceStore
+
+SWEEP_PARAMETERS = ("window", "z_enter", "z_exit")
+
+_WORKER = {}
+
+
+def parameter_grid(grid: dict) -> list:
+    """
+    {"window": [126, 252], "z_enter": [1.5, 2]} -> liste de dictionnaires (produit cartésien).
+    """
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def random_parameters(space: dict, n: int, seed=None) -> list:
+    """
+    n tirages dans space : une liste = choix discret, un tuple (bas, haut) = uniforme
+    (entier si les deux bornes sont entières).
+    """
+    rng = np.random.default_rng(seed)
+    samples = []
+    for _ in range(n):
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = int(rng.integers(low, high + 1))
+                else:
+                    params[name] = float(rng.uniform(low, high))
+            else:
+                params[name] = values[rng.integers(len(values))]
+        samples.append(params)
+    return samples
+
+
+def _init_worker(spec):
+    store = SharedPriceStore.attach(spec)
+    _WORKER["store"] = store
+    _WORKER["handler"] = DataHandler.from_store(store)
+
+
+def _run_job(job):
+    from strategies.pairs_trading import PairsTradingStrategy
+    pair, params = job
+    row = {"pair": "/".join(pair), **params}
+    try:
+        strategy = PairsTradingStrategy(tuple(pair), data_handler=_WORKER["handler"], save_outputs=False, **params)
+        _, _, _, analyzer = strategy.simulate()
+        row.update(analyzer.compute_statistics())
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+
+def run_sweep(pairs, params_list, data_path="data/s&p500.pkl", max_workers=None, chunksize=1) -> pd.DataFrame:
+    """
+    Backtests PairsTradingStrategy pour chaque (paire, paramètres) dans un pool de
+    processus. Les prix des symboles concernés sont copiés une seule fois en
+    mémoire partagée ; chaque worker s'y attache au lieu de relire le pickle.
+    Retourne une ligne par job : paire, paramètres et métriques de compute_statistics.
+    """
+    pairs = [tuple(pair) for pair in pairs]
+    unknown = {k for params in params_list for k in params} - set(SWEEP_PARAMETERS)
+    if unknown:
+        raise ValueError(f"Paramètres inconnus : {', '.join(sorted(unknown))}")
+    jobs = [(pair, params) for pair in pairs for params in params_list]
+    handler = get_data_handler(data_path)
+    store = SharedPriceStore.create(handler, [s for pair in pairs for s in pair])
+    try:
+        with ProcessPoolExecutor(
+            max_workers=max_workers or os.cpu_count(), initializer=_init_worker, initargs=(store.spec,)
+        ) as pool:
+            rows = list(pool.map(_run_job, jobs, chunksize=chunksize))
+    finally:
+        store.unlink()
+    return pd.DataFrame(rows)
+
+
+def _parse_values(text):
+    return [int(v) if v.lstrip("-").isdigit() else float(v) for v in text.split(",")]
+
+
+if __name__ == "__main__":
+    # python -m utils.pairs_sweep AVB,CPT --window 126,252 --z-enter 1.5,2,2.5 --z-exit 0.5,1
+    parser = argparse.ArgumentParser(description="Balayage de paramètres du pairs trading")
+    parser.add_argument("pairs", nargs="+", help="paires au format S1,S2")
+    parser.add_argument("--data", default="data/s&p500.pkl")
+    parser.add_argument("--window", type=_parse_values)
+    parser.add_argument("--z-enter", type=_parse_values)
+    parser.add_argument("--z-exit", type=_parse_values)
+    parser.add_argument("--random", type=int, help="n tirages aléatoires entre min et max de chaque liste")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--out", default="output/Pairs Trading Strategy/sweep.csv")
+    args = parser.parse_args()
+
+    grid = {
+        name: values for name, values in
+        (("window", args.window), ("z_enter", args.z_enter), ("z_exit", args.z_exit)) if values
+    }
+    if args.random:
+        space = {name: (min(values), max(values)) if len(values) > 1 else values for name, values in grid.items()}
+        params_list = random_parameters(space, args.random, seed=args.seed)
+    else:
+        params_list = parameter_grid(grid)
+    results = run_sweep(
+        [tuple(p.split(",")) for p in args.pairs], params_list, data_path=args.data, max_workers=args.workers
+    )
+    os.makedirs(os.path.dirname(args.out), exist_ok=True)
+    results.to_csv(args.out, index=False)
+    print(results.to_string(index=False))
@@ -0,0 +1,428 @@
+import json
+import os
+import re
+import shutil
+import sys
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+MANIFEST = "manifest.json"
+MAX_RESIDENT_SYMBOLS = 64
+VOLUME_FIELD = "Volume"
+UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def store_path_for(data_path, compact=False):
+    """
+    Retourne le chemin du store associé à un pickle (data/etf.pkl -> data/etf.store,
+    ou data/etf.compact.store en mode compact).
+    """
+    root, _ = os.path.splitext(data_path)
+    return root + (".compact.store" if compact else ".store")
+
+
+def is_store(path):
+    return path is not None and os.path.isfile(os.path.join(path, MANIFEST))
+
+
+def open_store(path, max_resident_symbols=MAX_RESIDENT_SYMBOLS):
+    with open(os.path.join(path, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    layout = manifest.get("layout")
+    if layout == ColumnarPriceStore.layout:
+        return ColumnarPriceStore(path, manifest)
+    if layout == PartitionedPriceStore.layout:
+        return PartitionedPriceStore(path, manifest, max_resident_symbols)
+    raise ValueError(f"Layout de store inconnu : {layout}")
+
+
+class PriceStore(ABC):
+    """
+    Store de prix sur disque : un calendrier maître partagé, une série de prix
+    par (symbole, champ) alignée sur ce calendrier et un masque de validité par
+    symbole, lus sans désérialiser le reste de l'univers.
+    """
+    layout = None
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+        dates = np.load(os.path.join(path, "dates.npy"))
+        self.dates = pd.DatetimeIndex(dates, name=manifest.get("index_name", "Date"))
+
+    @property
+    def symbols(self):
+        return list(self.manifest["symbols"])
+
+    @property
+    def calendar_options(self):
+        return self.manifest.get("calendar", {})
+
+    @property
+    def compact(self):
+        return self.manifest.get("compact", False)
+
+    def _decode_volume(self, values, mask):
+        # uint32 (éventuellement mis à l'échelle) -> float64, NaN hors masque
+        volume = values.astype(np.float64) * self.manifest.get("volume_scale", 1)
+        volume[~mask] = np.nan
+        return volume
+
+    def fields(self, symbol):
+        return self.manifest["symbols"][symbol]["fields"]
+
+    @property
+    def nbytes(self):
+        return 0
+
+    @abstractmethod
+    def column(self, symbol, field):
+        """Série (symbole, champ) alignée sur le calendrier maître."""
+
+    @abstractmethod
+    def mask(self, symbol):
+        """Masque booléen des dates où le symbole a réellement coté."""
+
+    def rows(self, start=None, end=None):
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return lo, hi
+
+
+class ColumnarPriceStore(PriceStore):
+    """
+    Layout colonnaire : values.f64 contient une ligne contiguë de n_dates float64
+    par (symbole, champ), ouverte via numpy.memmap ; masks.bits une ligne de bits
+    de validité par symbole. En mode compact, les prix sont dans values.f32 et
+    les volumes en uint32 dans volumes.u32.
+    """
+    layout = "columnar"
+
+    def __init__(self, path, manifest):
+        super().__init__(path, manifest)
+        n_columns = manifest["n_columns"]
+        n_symbols = len(manifest["symbols"])
+        self._volumes = None
+        self._decoded = {}
+        if n_columns:
+            self._values = np.memmap(
+                os.path.join(path, "values.f32" if self.compact else "values.f64"),
+                dtype=np.float32 if self.compact else np.float64, mode="r",
+                shape=(n_columns, len(self.dates))
+            )
+            if manifest.get("n_volumes"):
+                self._volumes = np.memmap(
+                    os.path.join(path, "volumes.u32"), dtype=np.uint32, mode="r",
+                    shape=(manifest["n_volumes"], len(self.dates))
+                )
+            self._masks = np.memmap(
+                os.path.join(path, "masks.bits"), dtype=np.uint8, mode="r",
+                shape=(n_symbols, _packed_length(len(self.dates)))
+            )
+        else:
+            self._values = np.empty((0, len(self.dates)))
+            self._masks = np.empty((0, _packed_length(len(self.dates))), dtype=np.uint8)
+
+    @property
+    def nbytes(self):
+        volumes = self._volumes.nbytes if self._volumes is not None else 0
+        return int(self._values.nbytes + self._masks.nbytes + volumes)
+
+    def column(self, symbol, field):
+        meta = self.manifest["symbols"][symbol]
+        if self.compact and field == VOLUME_FIELD and field in meta.get("volume_row", {}):
+            if symbol not in self._decoded:
+                self._decoded[symbol] = self._decode_volume(self._volumes[meta["volume_row"][field]], self.mask(symbol))
+                self._decoded[symbol].flags.writeable = False
+            return self._decoded[symbol]
+        offsets = meta["offsets"]
+        if field not in offsets:
+            raise KeyError(field)
+        return self._values[offsets[field]]
+
+    def mask(self, symbol):
+        row = self.manifest["symbols"][symbol]["mask_row"]
+        return np.unpackbits(self._masks[row], count=len(self.dates)).astype(bool)
+
+
+class PartitionedPriceStore(PriceStore):
+    """
+    Layout partitionné : un répertoire par symbole contenant un .npy par champ,
+    limité à la plage [lo, hi) du calendrier où le symbole existe. Seuls les
+    symboles et champs demandés sont lus, et au plus max_resident_symbols
+    symboles restent en mémoire (LRU).
+    """
+    layout = "partitioned"
+
+    def __init__(self, path, manifest, max_resident_symbols=MAX_RESIDENT_SYMBOLS):
+        super().__init__(path, manifest)
+        self.max_resident_symbols = max_resident_symbols
+        self._resident = OrderedDict()
+
+    @property
+    def nbytes(self):
+        return int(sum(a.nbytes for fields in self._resident.values() for a in fields.values()))
+
+    def _load(self, symbol, name, fill):
+        meta = self.manifest["symbols"][symbol]
+        fields = self._resident.get(symbol)
+        if fields is None:
+            fields = self._resident[symbol] = {}
+        self._resident.move_to_end(symbol)
+        if name not in fields:
+            values = np.load(os.path.join(self.path, meta["dir"], f"{name}.npy"))
+            if fill is False:
+                values = np.unpackbits(values, count=meta["hi"] - meta["lo"]).astype(bool)
+            elif values.dtype == np.uint32:
+                values = self._decode_volume(values, self.mask(symbol)[meta["lo"]:meta["hi"]])
+            full = np.full(len(self.dates), fill, dtype=values.dtype)
+            full[meta["lo"]:meta["hi"]] = values
+            full.flags.writeable = False
+            fields[name] = full
+        while len(self._resident) > self.max_resident_symbols:
+            self._resident.popitem(last=False)
+        return fields[name]
+
+    def column(self, symbol, field):
+        meta = self.manifest["symbols"][symbol]
+        if field not in meta["fields"]:
+            raise KeyError(field)
+        return self._load(symbol, meta["files"][field], np.nan)
+
+    def mask(self, symbol):
+        return self._load(symbol, "mask", False)
+
+
+def _packed_length(n):
+    return (n + 7) // 8
+
+
+def volume_scale(df: pd.DataFrame):
+    """
+    Facteur (puissance de 10) pour faire tenir tous les volumes en uint32.
+    """
+    volumes = df.xs(VOLUME_FIELD, axis=1, level=1) if VOLUME_FIELD in df.columns.get_level_values(1) else None
+    peak = np.nanmax(volumes.to_numpy(dtype=np.float64, na_value=np.nan), initial=0) if volumes is not None else 0
+    scale = 1
+    while peak / scale > UINT32_MAX:
+        scale *= 10
+    return scale
+
+
+def encode_volume(values, scale):
+    values = np.nan_to_num(values / scale, nan=0.0)
+    return np.clip(np.rint(values), 0, UINT32_MAX).astype(np.uint32)
+
+
+def align_calendar(df: pd.DataFrame, calendar=None, reference=None, ffill=False):
+    """
+    Aligne tous les symboles sur un calendrier maître et calcule leurs masques de
+    données présentes. Le calendrier est, par ordre de priorité : `calendar`
+    explicite, les dates où `reference` cote, sinon toutes les dates du fichier.
+    Avec ffill=True, les trous internes (jusqu'à la dernière cotation de chaque
+    symbole) sont comblés par la dernière valeur connue ; le masque continue
+    d'indiquer les valeurs réellement observées.
+    """
+    df = df.sort_index()
+    if calendar is not None:
+        master = pd.DatetimeIndex(calendar, name=df.index.name)
+    elif reference is not None:
+        master = df.index[df[reference].notna().any(axis=1).to_numpy()]
+    else:
+        master = df.index
+    df = df.reindex(master)
+
+    masks = {}
+    filled = {}
+    for symbol in df.columns.get_level_values(0).unique():
+        frame = df[symbol]
+        valid = frame.notna().any(axis=1).to_numpy()
+        masks[symbol] = valid
+        if ffill and valid.any():
+            last = np.flatnonzero(valid)[-1]
+            frame = frame.copy()
+            frame.iloc[:last + 1] = frame.iloc[:last + 1].ffill()
+        filled[symbol] = frame
+    if ffill:
+        df = pd.concat(filled, axis=1)
+        df.columns.names = ['Ticker', 'Price']
+    options = {"reference": reference, "ffill": bool(ffill)}
+    return df, masks, options
+
+
+def _publish(tmp_path, out_path):
+    # Remplace le store existant en une seule étape visible pour les lecteurs
+    if os.path.isdir(out_path):
+        old_path = out_path + ".old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.replace(out_path, old_path)
+        os.replace(tmp_path, out_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, out_path)
+
+
+def _start_store(df, out_path):
+    tmp_path = out_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, "dates.npy"), df.index.values.astype("datetime64[ns]"))
+    return tmp_path
+
+
+def _finish_store(tmp_path, out_path, manifest):
+    with open(os.path.join(tmp_path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    _publish(tmp_path, out_path)
+    return out_path
+
+
+def write_columnar(df: pd.DataFrame, out_path, masks, calendar_options, compact=False):
+    """
+    Écrit un DataFrame aligné à colonnes MultiIndex (Ticker, Price) au format colonnaire.
+    """
+    tmp_path = _start_store(df, out_path)
+    n_dates = len(df.index)
+
+    symbols = {}
+    n_columns = 0
+    n_volumes = 0
+    for k, symbol in enumerate(df.columns.get_level_values(0).unique()):
+        fields = list(df[symbol].columns)
+        prices = [f for f in fields if not (compact and f == VOLUME_FIELD)]
+        symbols[symbol] = {
+            "fields": fields,
+            "offsets": {field: n_columns + j for j, field in enumerate(prices)},
+            "mask_row": k,
+        }
+        n_columns += len(prices)
+        if compact and VOLUME_FIELD in fields:
+            symbols[symbol]["volume_row"] = {VOLUME_FIELD: n_volumes}
+            n_volumes += 1
+
+    scale = volume_scale(df) if compact else 1
+    if n_columns:
+        values = np.memmap(
+            os.path.join(tmp_path, "values.f32" if compact else "values.f64"),
+            dtype=np.float32 if compact else np.float64, mode="w+",
+            shape=(n_columns, n_dates)
+        )
+        bits = np.memmap(
+            os.path.join(tmp_path, "masks.bits"), dtype=np.uint8, mode="w+",
+            shape=(len(symbols), _packed_length(n_dates))
+        )
+        volumes = np.memmap(
+            os.path.join(tmp_path, "volumes.u32"), dtype=np.uint32, mode="w+",
+            shape=(n_volumes, n_dates)
+        ) if n_volumes else None
+        for symbol, meta in symbols.items():
+            for field, offset in meta["offsets"].items():
+                values[offset] = df[(symbol, field)].to_numpy(dtype=np.float64, na_value=np.nan)
+            for field, row in meta.get("volume_row", {}).items():
+                volumes[row] = encode_volume(df[(symbol, field)].to_numpy(dtype=np.float64, na_value=np.nan), scale)
+            bits[meta["mask_row"]] = np.packbits(masks[symbol])
+        values.flush()
+        bits.flush()
+        if volumes is not None:
+            volumes.flush()
+        del values, bits, volumes
+
+    manifest = {
+        "layout": ColumnarPriceStore.layout,
+        "index_name": df.index.name or "Date",
+        "calendar": calendar_options,
+        "compact": compact,
+        "volume_scale": scale,
+        "n_columns": n_columns,
+        "n_volumes": n_volumes,
+        "symbols": symbols,
+    }
+    return _finish_store(tmp_path, out_path, manifest)
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(name))
+
+
+def write_partitioned(df: pd.DataFrame, out_path, masks, calendar_options, compact=False):
+    """
+    Écrit un DataFrame aligné à colonnes MultiIndex (Ticker, Price) au format partitionné.
+    """
+    tmp_path = _start_store(df, out_path)
+    scale = volume_scale(df) if compact else 1
+
+    symbols = {}
+    for k, symbol in enumerate(df.columns.get_level_values(0).unique()):
+        frame = df[symbol]
+        valid = np.flatnonzero(frame.notna().any(axis=1).to_numpy())
+        lo, hi = (int(valid[0]), int(valid[-1]) + 1) if len(valid) else (0, 0)
+        directory = f"{k:05d}_{_safe_name(symbol)}"
+        os.makedirs(os.path.join(tmp_path, directory))
+        files = {}
+        for j, field in enumerate(frame.columns):
+            files[field] = f"{j:02d}_{_safe_name(field)}"
+            values = frame[field].to_numpy(dtype=np.float64, na_value=np.nan)[lo:hi]
+            if compact:
+                values = encode_volume(values, scale) if field == VOLUME_FIELD else values.astype(np.float32)
+            np.save(os.path.join(tmp_path, directory, f"{files[field]}.npy"), values)
+        np.save(os.path.join(tmp_path, directory, "mask.npy"), np.packbits(masks[symbol][lo:hi]))
+        symbols[symbol] = {"fields": list(frame.columns), "dir": directory, "files": files, "lo": lo, "hi": hi}
+
+    manifest = {
+        "layout": PartitionedPriceStore.layout,
+        "index_name": df.index.name or "Date",
+        "calendar": calendar_options,
+        "compact": compact,
+        "volume_scale": scale,
+        "symbols": symbols,
+    }
+    return _finish_store(tmp_path, out_path, manifest)
+
+
+WRITERS = {
+    ColumnarPriceStore.layout: write_columnar,
+    PartitionedPriceStore.layout: write_partitioned,
+}
+
+
+def write_store(df: pd.DataFrame, out_path, layout=ColumnarPriceStore.layout, calendar=None, reference=None, ffill=False, compact=False):
+    """
+    Prétraitement unique (alignement sur le calendrier maître, masques, ffill
+    optionnel) puis écriture du store : chaque run part de tableaux déjà alignés.
+    compact=True stocke les prix en float32 et les volumes en uint32.
+    """
+    aligned, masks, calendar_options = align_calendar(df, calendar=calendar, reference=reference, ffill=ffill)
+    return WRITERS[layout](aligned, out_path, masks, calendar_options, compact=compact)
+
+
+def convert_pickle(pkl_path, out_path=None, layout=ColumnarPriceStore.layout, reference=None, ffill=False, compact=False):
+    """
+    Conversion unique d'un pickle yfinance (data/etf.pkl, data/s&p500.pkl) en store.
+    """
+    out_path = out_path or store_path_for(pkl_path, compact)
+    df = pd.read_pickle(pkl_path)
+    return write_store(df, out_path, layout, reference=reference, ffill=ffill, compact=compact)
+
+
+if __name__ == "__main__":
+    # python -m utils.price_store data/etf.pkl
+    # python -m utils.price_store --partitioned "data/s&p500.pkl"
+    # python -m utils.price_store --reference SPY --ffill data/etf.pkl
+    # python -m utils.price_store --partitioned --compact "data/s&p500.pkl"
+    args = sys.argv[1:]
+    options = {"layout": ColumnarPriceStore.layout}
+    if "--partitioned" in args:
+        args.remove("--partitioned")
+        options["layout"] = PartitionedPriceStore.layout
+    for flag in ("ffill", "compact"):
+        if f"--{flag}" in args:
+            args.remove(f"--{flag}")
+            options[flag] = True
+    if "--reference" in args:
+        i = args.index("--reference")
+        options["reference"] = args[i + 1]
+        del args[i:i + 2]
+    for path in args:
+        print(f"{path} -> {convert_pickle(path, **options)}")
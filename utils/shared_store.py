@@ -0,0 +1,101 @@
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from utils.price_store import PriceStore
+
+
+class SharedPriceStore(PriceStore):
+    """
+    Store de prix placé dans un bloc multiprocessing.shared_memory : le processus
+    parent copie une fois les colonnes (float64) et masques des symboles voulus,
+    les workers s'y attachent via spec sans copie ni désérialisation du pickle.
+    """
+    layout = "shared"
+
+    def __init__(self, spec, shm):
+        self.path = None
+        self.manifest = spec["manifest"]
+        self.spec = spec
+        self.shm = shm
+        self.dates = pd.DatetimeIndex(spec["dates"], name=self.manifest.get("index_name", "Date"))
+        n_dates = len(self.dates)
+        n_columns = self.manifest["n_columns"]
+        n_symbols = len(self.manifest["symbols"])
+        self._values = np.ndarray((n_columns, n_dates), dtype=np.float64, buffer=shm.buf)
+        self._masks = np.ndarray(
+            (n_symbols, n_dates), dtype=np.bool_, buffer=shm.buf, offset=self._values.nbytes
+        )
+
+    @classmethod
+    def create(cls, data_handler, symbols):
+        """
+        Copie les symboles de data_handler en mémoire partagée (processus parent).
+        """
+        symbols = list(dict.fromkeys(symbols))
+        dates = data_handler.calendar()
+        manifest = {"layout": cls.layout, "index_name": dates.name, "symbols": {}}
+        n_columns = 0
+        for k, symbol in enumerate(symbols):
+            fields = data_handler.fields(symbol)
+            manifest["symbols"][symbol] = {
+                "fields": fields,
+                "offsets": {field: n_columns + j for j, field in enumerate(fields)},
+                "mask_row": k,
+            }
+            n_columns += len(fields)
+        manifest["n_columns"] = n_columns
+        size = max(n_columns * len(dates) * 8 + len(symbols) * len(dates), 1)
+        spec = {
+            "name": None,
+            "manifest": manifest,
+            "dates": dates.values.astype("datetime64[ns]"),
+        }
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        spec["name"] = shm.name
+        store = cls(spec, shm)
+        for symbol, meta in manifest["symbols"].items():
+            for field, offset in meta["offsets"].items():
+                store._values[offset] = data_handler.column(symbol, field)
+            store._masks[meta["mask_row"]] = data_handler.mask(symbol)
+        store._freeze()
+        return store
+
+    @classmethod
+    def attach(cls, spec):
+        """
+        S'attache au bloc créé par le parent (processus worker).
+        """
+        # Les workers partagent le resource_tracker du parent : l'enregistrement est
+        # idempotent et le bloc n'est libéré que par unlink() côté parent
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        store = cls(spec, shm)
+        store._freeze()
+        return store
+
+    def _freeze(self):
+        self._values.flags.writeable = False
+        self._masks.flags.writeable = False
+
+    @property
+    def nbytes(self):
+        return int(self._values.nbytes + self._masks.nbytes)
+
+    def column(self, symbol, field):
+        offsets = self.manifest["symbols"][symbol]["offsets"]
+        if field not in offsets:
+            raise KeyError(field)
+        return self._values[offsets[field]]
+
+    def mask(self, symbol):
+        return self._masks[self.manifest["symbols"][symbol]["mask_row"]]
+
+    def close(self):
+        self._values = self._masks = None
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Libère le bloc (à appeler une fois, par le processus qui l'a créé).
+        """
+        self.close()
+        self.shm.unlink()
@@ -0,0 +1,54 @@
+import numpy as np
+from core.vectorized import ffill_rows
+
+
+def hysteresis_signals(z, z_enter, z_exit):
+    """
+    Machine à états entrée/sortie du pairs trading, vectorisée sur toute la série
+    de z-scores (n,) ou sur un bloc (n, k) de paires :
+    - à plat : z > z_enter -> short du spread, z < -z_enter -> long du spread ;
+    - en position : |z| < z_exit -> sortie ; sinon la position (et son sens) est conservée.
+    Retourne un dict de tableaux de même forme que z : 'short', 'long', 'exit'
+    (signaux du jour) et 'position' (+1 long, -1 short, 0 à plat après le signal).
+    """
+    z = np.asarray(z, dtype=np.float64)
+    shape = z.shape
+    z = z.reshape(len(z), -1)
+    if z_exit > z_enter:
+        # Bandes qui se chevauchent : un même jour peut ouvrir ou fermer selon l'état
+        state = _hysteresis_loop(z, z_enter, z_exit)
+    else:
+        # Événements (+1 short, -1 long, 0 sortie) propagés jusqu'au suivant
+        events = np.full(z.shape, np.nan)
+        events[np.abs(z) < z_exit] = 0.0
+        events[z > z_enter] = 1.0
+        events[z < -z_enter] = -1.0
+        state = np.nan_to_num(ffill_rows(events), nan=0.0)
+        previous = np.vstack([np.zeros((1, z.shape[1])), state[:-1]])
+        # Le sens est celui du jour d'entrée : pas de retournement sans sortie
+        entry = (state != 0) & (previous == 0)
+        side = ffill_rows(np.where(entry, state, np.nan))
+        state = np.where(state != 0, side, 0.0)
+
+    previous = np.vstack([np.zeros((1, z.shape[1])), state[:-1]])
+    entry = (state != 0) & (previous == 0)
+    return {
+        "short": (entry & (state > 0)).reshape(shape),
+        "long": (entry & (state < 0)).reshape(shape),
+        "exit": ((state == 0) & (previous != 0)).reshape(shape),
+        "position": (-state).reshape(shape),
+    }
+
+
+def _hysteresis_loop(z, z_enter, z_exit):
+    state = np.zeros(z.shape)
+    current = np.zeros(z.shape[1])
+    for t in range(len(z)):
+        flat = current == 0
+        current = np.where(
+            flat,
+            np.where(z[t] > z_enter, 1.0, np.where(z[t] < -z_enter, -1.0, 0.0)),
+            np.where(np.abs(z[t]) < z_exit, 0.0, current),
+        )
+        state[t] = current
+    return state
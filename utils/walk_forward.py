@@ -0,0 +1,199 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from core.compute_performance import PerformanceAnalyzer
+from utils.backtest_utils import DataHandler, get_data_handler
+from utils.options_utils import load_yaml
+from utils.pairs_sweep import parameter_grid
+from utils.shared_store import SharedPriceStore
+
+_WORKER = {}
+
+
+def _pairs(spec, handler, params, start, end):
+    from strategies.pairs_trading import PairsTradingStrategy
+    return PairsTradingStrategy(
+        tuple(spec["pair"]), data_handler=handler, save_outputs=False, start=start, end=end, **params
+    )
+
+
+def _markowitz(spec, handler, params, start, end):
+    from strategies.markowitz import Markowitz
+    return Markowitz(list(spec["assets"]), data_handler=handler, save_outputs=False, start=start, end=end, **params)
+
+
+# Nom -> (constructeur, clé des symboles dans spec, données par défaut)
+WALK_FORWARD_STRATEGIES = {
+    "pairs": (_pairs, "pair", "data/s&p500.pkl"),
+    "markowitz": (_markowitz, "assets", "data/etf.pkl"),
+}
+
+
+def build_strategy(spec, handler, params=None, start=None, end=None):
+    """
+    Instancie la stratégie décrite par spec ({"strategy": "pairs", "pair": [...]} ou
+    {"strategy": "markowitz", "assets": [...]}) sur [start, end] avec params.
+    """
+    if spec["strategy"] not in WALK_FORWARD_STRATEGIES:
+        raise ValueError(f"Stratégie inconnue : {spec['strategy']}")
+    builder = WALK_FORWARD_STRATEGIES[spec["strategy"]][0]
+    return builder(spec, handler, params or {}, start, end)
+
+
+def simulate_strategy(strategy):
+    """
+    (portfolio_df, orders, analyzer) quelle que soit la signature de simulate().
+    """
+    if hasattr(strategy, "target_weights"):
+        # Pas de pool imbriqué dans un worker : optimisation des dates en série
+        result = strategy.replay(strategy.target_weights(max_workers=1))
+    else:
+        result = strategy.simulate()
+    return result[0], result[1], result[-1]
+
+
+def walk_forward_folds(dates, train_size, test_size, anchored=False):
+    """
+    Découpe dates en plis (train_start, train_end, test_start, test_end) consécutifs :
+    test_size séances de test précédées de train_size séances d'entraînement
+    (fenêtre glissante) ou de tout l'historique depuis dates[0] (anchored=True).
+    Les périodes de test se suivent sans chevauchement et font toutes test_size
+    séances : les dernières dates qui ne remplissent pas un pli complet sont ignorées.
+    """
+    folds = []
+    for test_lo in range(train_size, len(dates) - test_size + 1, test_size):
+        test_hi = test_lo + test_size
+        train_lo = 0 if anchored else test_lo - train_size
+        folds.append((dates[train_lo], dates[test_lo - 1], dates[test_lo], dates[test_hi - 1]))
+    return folds
+
+
+def stitch_portfolios(portfolios, capital):
+    """
+    Enchaîne les portefeuilles des périodes de test : chaque pli est remis à
+    l'échelle de la valeur finale du précédent (positions, cash et valeur).
+    """
+    parts, value = [], capital
+    for portfolio_df in portfolios:
+        part = portfolio_df * (value / portfolio_df["value"].iloc[0])
+        parts.append(part)
+        value = part["value"].iloc[-1]
+    return pd.concat(parts).fillna(0.0)
+
+
+def _init_worker(spec, data_path):
+    store = SharedPriceStore.attach(spec)
+    _WORKER["store"] = store
+    _WORKER["handler"] = DataHandler.from_store(store, data_path)
+
+
+def _score(spec, handler, params, start, end, metric):
+    # (score, erreur) : un jeu de paramètres qui échoue est écarté, pas tout le pli
+    try:
+        _, _, analyzer = simulate_strategy(build_strategy(spec, handler, params, start, end))
+        score = analyzer.raw_statistics()[metric]
+    except Exception as e:
+        return np.nan, f"{type(e).__name__}: {e}"
+    return (score, None) if np.isfinite(score) else (np.nan, None)
+
+
+def _run_fold(job, handler=None):
+    spec, params_list, fold, metric = job
+    handler = handler or _WORKER["handler"]
+    train_start, train_end, test_start, test_end = fold
+    scores, errors = zip(*(_score(spec, handler, params, train_start, train_end, metric) for params in params_list))
+    if np.all(np.isnan(scores)):
+        error = next((e for e in errors if e), "métrique non définie")
+        raise RuntimeError(f"Aucun jeu de paramètres évaluable sur {train_start.date()} - {train_end.date()} ({error})")
+    best = params_list[int(np.nanargmax(scores))]
+    portfolio_df, orders, analyzer = simulate_strategy(build_strategy(spec, handler, best, test_start, test_end))
+    row = {
+        "train_start": train_start, "train_end": train_end, "test_start": test_start, "test_end": test_end,
+        **best, f"train {metric}": np.nanmax(scores),
+    }
+    row.update({f"test {key}": value for key, value in analyzer.raw_statistics().items()})
+    return row, portfolio_df, orders
+
+
+def run_walk_forward(spec, grid, train_size=504, test_size=126, anchored=False, metric="Sharpe Ratio",
+                     start=None, end=None, data_path=None, max_workers=None):
+    """
+    Walk-forward : pour chaque pli, choisit dans grid les paramètres maximisant
+    metric (clé de raw_statistics) sur l'entraînement, puis les évalue sur la période
+    de test suivante. Les plis tournent dans un pool de processus, les prix des
+    symboles de spec étant partagés en mémoire.
+    Retourne (folds_df, portfolio_df, analyzer) : une ligne par pli et la courbe
+    hors échantillon reconstituée, analysée par PerformanceAnalyzer.
+    L'historique découpé est [start, end], par défaut la période de config/general.yaml.
+    """
+    _, symbols_key, default_path = WALK_FORWARD_STRATEGIES[spec["strategy"]]
+    data_path = data_path or default_path
+    params_list = parameter_grid(grid)
+    handler = get_data_handler(data_path)
+    general_config = load_yaml("config/general.yaml")
+    dates = handler.trading_dates(
+        general_config["start_date"] if start is None else start, general_config["end_date"] if end is None else end
+    )
+    folds = walk_forward_folds(dates, train_size, test_size, anchored)
+    if not folds:
+        raise ValueError(
+            f"Historique trop court : {len(dates)} séances pour train_size={train_size} et test_size={test_size}"
+        )
+    jobs = [(spec, params_list, fold, metric) for fold in folds]
+
+    n_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if n_workers <= 1:
+        results = [_run_fold(job, handler) for job in jobs]
+    else:
+        store = SharedPriceStore.create(handler, list(spec[symbols_key]))
+        try:
+            with ProcessPoolExecutor(
+                max_workers=n_workers, initializer=_init_worker, initargs=(store.spec, data_path)
+            ) as pool:
+                results = list(pool.map(_run_fold, jobs))
+        finally:
+            store.unlink()
+
+    folds_df = pd.DataFrame([row for row, _, _ in results])
+    strategy = build_strategy(spec, handler, start=folds[0][2], end=folds[-1][3])
+    portfolio_df = stitch_portfolios([portfolio for _, portfolio, _ in results], strategy.capital)
+    orders = {date: day_orders for _, _, fold_orders in results for date, day_orders in fold_orders.items()}
+    analyzer = PerformanceAnalyzer(handler, portfolio_df, orders, strategy=strategy)
+    return folds_df, portfolio_df, analyzer
+
+
+def _parse_param(text):
+    name, values = text.split("=")
+    return name, [int(v) if v.lstrip("-").isdigit() else float(v) for v in values.split(",")]
+
+
+if __name__ == "__main__":
+    # python -m utils.walk_forward pairs AVB,CPT --param window=126,252 --param z_enter=1.5,2 --train 504 --test 126
+    # python -m utils.walk_forward markowitz SPY,QQQ,VEA,EEM,BIL,GLD --param diversification=0.3,0.6 --anchored
+    parser = argparse.ArgumentParser(description="Optimisation walk-forward")
+    parser.add_argument("strategy", choices=sorted(WALK_FORWARD_STRATEGIES))
+    parser.add_argument("symbols", help="paire (S1,S2) ou actifs séparés par des virgules")
+    parser.add_argument("--param", type=_parse_param, action="append", default=[], help="nom=v1,v2,...")
+    parser.add_argument("--train", type=int, default=504, help="séances d'entraînement par pli")
+    parser.add_argument("--test", type=int, default=126, help="séances de test par pli")
+    parser.add_argument("--anchored", action="store_true", help="entraînement depuis le début de l'historique")
+    parser.add_argument("--metric", default="Sharpe Ratio")
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--data")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    spec = {"strategy": args.strategy, WALK_FORWARD_STRATEGIES[args.strategy][1]: args.symbols.split(",")}
+    folds_df, portfolio_df, analyzer = run_walk_forward(
+        spec, dict(args.param), train_size=args.train, test_size=args.test, anchored=args.anchored,
+        metric=args.metric, start=args.start, end=args.end, data_path=args.data, max_workers=args.workers
+    )
+    out_dir = os.path.join("output", analyzer.strategy.name, "walk_forward")
+    os.makedirs(out_dir, exist_ok=True)
+    folds_df.to_csv(os.path.join(out_dir, "folds.csv"), index=False)
+    portfolio_df.to_csv(os.path.join(out_dir, "portfolio.csv"))
+    print(folds_df.to_string(index=False))
+    print(pd.Series(analyzer.compute_statistics(), name="Hors échantillon").to_string())
@@ -0,0 +1,112 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy.interpolate import CubicSpline
+
+RISKFREE_CSV = "market_data/riskfree.csv"
+
+TENOR_TO_DAYS = {
+    "1W": 7,
+    "2W": 14,
+    "1M": 30,
+    "2M": 60,
+    "3M": 90,
+    "6M": 180,
+    "9M": 270,
+    "1Y": 365,
+    "2Y": 730,
+    "3Y": 3 * 365,
+    "5Y": 5 * 365,
+    "7Y": 7 * 365,
+    "10Y": 10 * 365,
+    "20Y": 20 * 365,
+    "30Y": 30 * 365,
+}
+
+_CURVES = {}
+
+
+class YieldCurve:
+    """
+    Courbe des taux sans risque chargée une fois : une matrice (n_dates, n_tenors)
+    indexée par date, interpolée en maturité (nearest, linear ou cubic) et évaluée
+    de façon vectorisée sur des tableaux de (date, tau).
+    Pour une date absente, la dernière courbe disponible avant cette date est utilisée.
+    """
+    METHODS = ("nearest", "linear", "cubic")
+
+    def __init__(self, df: pd.DataFrame, method="linear"):
+        if method not in self.METHODS:
+            raise ValueError(f"Méthode d'interpolation inconnue : {method}")
+        self.method = method
+        df = df.copy()
+        df["date"] = pd.to_datetime(df["date"])
+        if "tenor_years" not in df.columns:
+            df["tenor_years"] = df["tenor"].map(TENOR_TO_DAYS) / 365.0
+        table = df.pivot_table(index="date", columns="tenor_years", values="rate", aggfunc="first").sort_index()
+        self.dates = table.index.values
+        self.tenors = table.columns.to_numpy(dtype=np.float64)
+        self.rates = table.to_numpy(dtype=np.float64)
+        self._splines = {}
+
+    @classmethod
+    def from_csv(cls, path=RISKFREE_CSV, method="linear"):
+        return cls(pd.read_csv(path), method=method)
+
+    def date_rows(self, dates):
+        dates = np.atleast_1d(np.asarray(dates, dtype="datetime64[ns]"))
+        rows = np.searchsorted(self.dates, dates, side="right") - 1
+        if (rows < 0).any():
+            raise KeyError(f"Aucune courbe disponible avant {dates[rows < 0][0]}")
+        return rows
+
+    def _curve_at(self, row):
+        valid = ~np.isnan(self.rates[row])
+        return self.tenors[valid], self.rates[row, valid]
+
+    def _interpolate(self, row, tau, method):
+        tenors, rates = self._curve_at(row)
+        if method == "nearest":
+            idx = np.abs(tenors[None, :] - tau[:, None]).argmin(axis=1)
+            return rates[idx]
+        if method == "linear" or len(tenors) < 3:
+            return np.interp(tau, tenors, rates)
+        spline = self._splines.get(row)
+        if spline is None:
+            spline = self._splines[row] = CubicSpline(tenors, rates)
+        return spline(np.clip(tau, tenors[0], tenors[-1]))
+
+    def rate(self, dates, tau, method=None):
+        """
+        Taux pour chaque couple (date, tau) ; dates et tau sont diffusés l'un sur l'autre.
+        Retourne un scalaire si les deux entrées sont scalaires.
+        """
+        method = method or self.method
+        if method not in self.METHODS:
+            raise ValueError(f"Méthode d'interpolation inconnue : {method}")
+        scalar = np.ndim(dates) == 0 and np.ndim(tau) == 0
+        dates, tau = np.broadcast_arrays(
+            np.asarray(dates, dtype="datetime64[ns]"), np.asarray(tau, dtype=np.float64)
+        )
+        rows = self.date_rows(dates.ravel())
+        tau = tau.ravel()
+        out = np.empty(len(tau))
+        for row in np.unique(rows):
+            sel = rows == row
+            out[sel] = self._interpolate(row, tau[sel], method)
+        out = out.reshape(dates.shape)
+        return out.item() if scalar else out
+
+
+def get_yield_curve(path=RISKFREE_CSV):
+    """
+    Courbe partagée pour le processus, rechargée uniquement si le fichier change.
+    La méthode d'interpolation se choisit à chaque appel de rate(..., method=...).
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    curve = _CURVES.get(key)
+    if curve is None:
+        for old in [k for k in _CURVES if k[0] == key[0]]:
+            del _CURVES[old]
+        curve = _CURVES[key] = YieldCurve.from_csv(path)
+    return curve